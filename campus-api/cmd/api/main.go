@@ -47,6 +47,7 @@ func main() {
     http.HandleFunc("/edit_company", handlers.EditCompanyHandler(db))
     http.HandleFunc("/edit_student_job", handlers.EditStudentJobHandler(db))
     http.HandleFunc("/edit_education", handlers.EditEducationHandler(db))
+    http.HandleFunc("/edit_profile_batch", handlers.EditProfileBatchHandler(db))
 
     log.Println("Starting server on port 8080...")
     if err := http.ListenAndServe(":8080", nil); err != nil {
@@ -86,6 +86,112 @@ func EditEducationHandler(db *sql.DB) http.HandlerFunc {
     }
 }
 
+// execOwned runs an UPDATE/DELETE scoped to one user's row and fails when no row matched.
+func execOwned(tx *sql.Tx, query string, args ...interface{}) error {
+    res, err := tx.Exec(query, args...)
+    if err != nil {
+        return err
+    }
+    rowsAffected, err := res.RowsAffected()
+    if err != nil {
+        return err
+    }
+    if rowsAffected == 0 {
+        return sql.ErrNoRows
+    }
+    return nil
+}
+
+// EditProfileBatchHandler applies all job and education adds, edits and deletes of
+// one profile form in a single transaction.
+func EditProfileBatchHandler(db *sql.DB) http.HandlerFunc {
+    return func(w http.ResponseWriter, r *http.Request) {
+        var req models.ProfileBatchRequest
+        if err := json.NewDecoder(r.Body).Decode(&req); err != nil {
+            log.Printf("Error decoding profile batch: %v", err)
+            http.Error(w, "Invalid request format", http.StatusBadRequest)
+            return
+        }
+
+        log.Printf("Received profile batch for user %d: %d jobs, %d education, %d job deletes, %d education deletes",
+            req.UserID, len(req.Jobs), len(req.Education), len(req.DeletedJobs), len(req.DeletedEducation))
+
+        tx, err := db.Begin()
+        if err != nil {
+            log.Printf("Error starting transaction: %v", err)
+            http.Error(w, "Database transaction error", http.StatusInternalServerError)
+            return
+        }
+        defer tx.Rollback()
+
+        fail := func(what string, err error) {
+            if err == sql.ErrNoRows {
+                log.Printf("No rows affected for %s, check the IDs and user ID", what)
+                http.Error(w, "No rows affected for "+what+", check the IDs and user ID", http.StatusBadRequest)
+                return
+            }
+            log.Printf("Error applying %s: %v", what, err)
+            http.Error(w, "Failed to apply "+what, http.StatusInternalServerError)
+        }
+
+        for _, id := range req.DeletedJobs {
+            if err := execOwned(tx, `DELETE FROM jobs WHERE id=$1 AND user_id=$2`, id, req.UserID); err != nil {
+                fail("job delete", err)
+                return
+            }
+        }
+        for _, id := range req.DeletedEducation {
+            if err := execOwned(tx, `DELETE FROM education WHERE id=$1 AND user_id=$2`, id, req.UserID); err != nil {
+                fail("education delete", err)
+                return
+            }
+        }
+
+        for _, job := range req.Jobs {
+            if job.ID == 0 {
+                query := `INSERT INTO jobs (user_id, title, company, start_date, end_date, description) VALUES ($1, $2, $3, $4, $5, $6)`
+                if _, err := tx.Exec(query, req.UserID, job.Title, job.Company, job.StartDate, job.EndDate, job.Description); err != nil {
+                    fail("job insert", err)
+                    return
+                }
+                continue
+            }
+            query := `UPDATE jobs SET title=$1, company=$2, start_date=$3, end_date=$4, description=$5 WHERE id=$6 AND user_id=$7`
+            if err := execOwned(tx, query, job.Title, job.Company, job.StartDate, job.EndDate, job.Description, job.ID, req.UserID); err != nil {
+                fail("job update", err)
+                return
+            }
+        }
+
+        for _, edu := range req.Education {
+            if edu.ID == 0 {
+                query := `INSERT INTO education (user_id, school, degree, field_of_study, start_date, end_date, description) VALUES ($1, $2, $3, $4, $5, $6, $7)`
+                if _, err := tx.Exec(query, req.UserID, edu.School, edu.Degree, edu.FieldOfStudy, edu.StartDate, edu.EndDate, edu.Description); err != nil {
+                    fail("education insert", err)
+                    return
+                }
+                continue
+            }
+            query := `UPDATE education SET school=$1, degree=$2, field_of_study=$3, start_date=$4, end_date=$5, description=$6 WHERE id=$7 AND user_id=$8`
+            if err := execOwned(tx, query, edu.School, edu.Degree, edu.FieldOfStudy, edu.StartDate, edu.EndDate, edu.Description, edu.ID, req.UserID); err != nil {
+                fail("education update", err)
+                return
+            }
+        }
+
+        if err := tx.Commit(); err != nil {
+            log.Printf("Error committing transaction: %v", err)
+            http.Error(w, "Failed to commit transaction", http.StatusInternalServerError)
+            return
+        }
+
+        log.Printf("Profile batch applied for user %d", req.UserID)
+
+        w.WriteHeader(http.StatusOK)
+        json.NewEncoder(w).Encode(map[string]string{"message": "Profile updated successfully"})
+    }
+}
+
 func EditCompanyHandler(db *sql.DB) http.HandlerFunc {
     return func(w http.ResponseWriter, r *http.Request) {
         var company models.Company
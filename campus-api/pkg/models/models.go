@@ -86,6 +86,16 @@ type StudentRegistrationRequest struct {
     Education   []Education `json:"education"`
 }
 
+// ProfileBatchRequest carries many job and education changes for one student.
+// Entries with an ID are updated, entries without one are added.
+type ProfileBatchRequest struct {
+    UserID           int          `json:"userId"`
+    Jobs             []StudentJob `json:"jobs"`
+    Education        []Education  `json:"education"`
+    DeletedJobs      []int        `json:"deletedJobs"`
+    DeletedEducation []int        `json:"deletedEducation"`
+}
+
 type CompanyRegistrationRequest struct {
     UserID          int      `json:"userId"`
     Name            string   `json:"name"`
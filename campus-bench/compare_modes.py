@@ -0,0 +1,89 @@
+"""Compare campus-front's threaded (WSGI) and async (ASGI) serving modes.
+
+Starts fake_api.py with the given latency, then the front twice - once under
+`flask run` (threaded, as in the Dockerfile) and once under uvicorn (asgi:app) -
+and runs the same loadtest.py scenarios against each.
+
+    python compare_modes.py --latency-ms 100 --concurrency 64 --duration 15
+"""
+import argparse
+import os
+import secrets
+import subprocess
+import sys
+import time
+import requests
+from loadtest import print_report, run_scenario
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FRONT_DIR = os.path.join(HERE, '..', 'campus-front')
+
+
+def start(command, cwd, env=None):
+    return subprocess.Popen(command, cwd=cwd, env={**os.environ, **(env or {})},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up within {timeout}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=100.0, help='fake api latency per call')
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--jobs', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=15.0, help='seconds per scenario and mode')
+    parser.add_argument('--scenarios', default='anonymous,student,company')
+    parser.add_argument('--api-port', type=int, default=18080)
+    parser.add_argument('--front-port', type=int, default=15000)
+    args = parser.parse_args()
+
+    api_url = f'http://127.0.0.1:{args.api_port}'
+    front_url = f'http://127.0.0.1:{args.front_port}'
+    front_env = {'BACKEND_URL': api_url, 'RATE_LIMIT_ENABLED': 'false', 'MAX_IN_FLIGHT': '0',
+                 'SECRET_KEY': secrets.token_hex()}
+    modes = {
+        'threaded': [sys.executable, '-m', 'flask', '--app', 'main', 'run',
+                     '--port', str(args.front_port), '--with-threads'],
+        'async': [sys.executable, '-m', 'uvicorn', 'asgi:app',
+                  '--port', str(args.front_port), '--log-level', 'warning'],
+    }
+
+    api = start([sys.executable, 'fake_api.py', '--port', str(args.api_port), '--students', str(args.students),
+                 '--jobs', str(args.jobs), '--latency-ms', str(args.latency_ms)], HERE)
+    results = []
+    try:
+        wait_until_up(f'{api_url}/user_role?userID=1')
+        for mode, command in modes.items():
+            front = start(command, FRONT_DIR, front_env)
+            try:
+                wait_until_up(f'{front_url}/metrics')
+                run_args = argparse.Namespace(front_url=front_url, cv_url=None, duration=args.duration,
+                                              requests=0, concurrency=args.concurrency)
+                for name in args.scenarios.split(','):
+                    result = run_scenario(name, run_args)
+                    result['scenario'] = f'{mode}/{name}'
+                    results.append(result)
+            finally:
+                front.terminate()
+                front.wait()
+    finally:
+        api.terminate()
+        api.wait()
+
+    print(f'backend latency {args.latency_ms} ms, {args.concurrency} concurrent clients')
+    print_report(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""Stand-in for the campus-api service, for benchmarking campus-front locally.
+
+Serves the read endpoints the front depends on with synthetic data of a
+configurable size, after a configurable delay, and accepts the write endpoints
+with a plain 200/201.
+
+Users are derived from their id: ids below COMPANY_ID_BASE are students, ids
+from COMPANY_ID_BASE up are companies. Logging in as student<N>@bench.local or
+company<N>@bench.local yields the matching id.
+
+    python fake_api.py --port 8080 --jobs 50 --students 500 --latency-ms 20
+    BACKEND_URL=http://localhost:8080 flask --app main run   # in campus-front
+"""
+import argparse
+import json
+import random
+import re
+import time
+from flask import Flask, Response, request
+
+
+#######################################################################################
+#                                  Config                                             #
+#######################################################################################
+
+COMPANY_ID_BASE = 100000
+
+app = Flask(__name__)
+app.config.update(JOBS=50, STUDENTS=200, LATENCY_MS=0.0, JITTER_MS=0.0)
+
+_payload_cache = {}
+
+#######################################################################################
+#                                  Synthetic Data                                     #
+#######################################################################################
+
+def role_for(user_id):
+    return 'company' if user_id >= COMPANY_ID_BASE else 'student'
+
+
+def student(user_id):
+    return {
+        'id': str(user_id),
+        'email': f'student{user_id}@bench.local',
+        'fname': f'Student {user_id}',
+        'role': 'student',
+        'is_cv_created': 'true',
+        'cv_path': f'/static/assets/pdf/cv/student_cv_{user_id}.pdf',
+        'description': 'Computer science student looking for an internship. ' * 3,
+        'profileImage': '/usr/src/app/templates/static/assets/img/profile-img.jpg',
+        'jobs': [
+            {'id': str(user_id * 10 + n), 'title': f'Intern {n}', 'company': f'Company {n}',
+             'startDate': '01, 2021', 'endDate': '06, 2021', 'description': 'Built internal tools.'}
+            for n in range(2)
+        ],
+        'education': [
+            {'id': str(user_id * 10 + n), 'school': f'University {n}', 'degree': 'BSc',
+             'fieldOfStudy': 'Computer Science', 'startDate': '10, 2019', 'endDate': '06, 2023',
+             'description': 'Graduated with honours.'}
+            for n in range(2)
+        ],
+    }
+
+
+def company(user_id):
+    return {
+        'email': f'company{user_id - COMPANY_ID_BASE}@bench.local',
+        'fname': f'Recruiter {user_id}',
+        'role': 'company',
+        'name': f'Company {user_id}',
+        'size': '50-200',
+        'address': 'Tel Aviv, Israel',
+        'description': 'We build software. ' * 5,
+        'image_path': '/usr/src/app/templates/static/assets/img/logo.png',
+        'video_path': '',
+    }
+
+
+def job(job_id):
+    company_id = COMPANY_ID_BASE + job_id % 10
+    return {
+        'id': job_id,
+        'user_id': company_id,
+        'title': f'Junior Developer {job_id}',
+        'description': 'Work on our web platform. ' * 5,
+        'requirements': 'Python, SQL, curiosity.',
+        'status': 'Open',
+        'salary': '10000',
+        'address': 'Tel Aviv, Israel',
+        'company_email': f'company{job_id % 10}@bench.local',
+        'company_name': f'Company {company_id}',
+    }
+
+
+def user_details(user_id):
+    return company(user_id) if role_for(user_id) == 'company' else student(user_id)
+
+
+def cached_payload(name, build):
+    # The list endpoints are large and identical for every call, so they are encoded once.
+    if name not in _payload_cache:
+        _payload_cache[name] = json.dumps(build())
+    return _payload_cache[name]
+
+#######################################################################################
+#                                  Helpers                                            #
+#######################################################################################
+
+def simulate_latency():
+    delay = app.config['LATENCY_MS'] + random.uniform(0, app.config['JITTER_MS'])
+    if delay > 0:
+        time.sleep(delay / 1000)
+
+
+def json_response(body, status=200):
+    if not isinstance(body, str):
+        body = json.dumps(body)
+    return Response(body, status=status, mimetype='application/json')
+
+
+def user_id_arg(name='userID'):
+    try:
+        return int(request.args.get(name, ''))
+    except ValueError:
+        return None
+
+
+@app.before_request
+def before_request():
+    simulate_latency()
+
+#######################################################################################
+#                                  Routes                                             #
+#######################################################################################
+
+@app.route('/login', methods=['POST'])
+def login():
+    match = re.match(r'^(student|company)(\d+)@', (request.json or {}).get('email', ''))
+    user_id = 1
+    if match:
+        user_id = int(match.group(2)) + (COMPANY_ID_BASE if match.group(1) == 'company' else 0)
+    return json_response({'success': True, 'isVerified': True, 'hasSelectedRole': True, 'userId': user_id})
+
+
+@app.route('/user_role')
+def user_role():
+    user_id = user_id_arg()
+    if user_id is None:
+        return 'User ID is required', 400
+    return json_response({'role': role_for(user_id)})
+
+
+@app.route('/user_details')
+def get_user_details():
+    user_id = user_id_arg()
+    if user_id is None:
+        return 'User not found', 404
+    return json_response(user_details(user_id))
+
+
+@app.route('/student')
+def get_student():
+    user_id = user_id_arg()
+    if user_id is None or role_for(user_id) != 'student':
+        return 'Student not found', 404
+    return json_response(student(user_id))
+
+
+@app.route('/company')
+def get_company():
+    user_id = user_id_arg()
+    if user_id is None or role_for(user_id) != 'company':
+        return 'Company not found', 404
+    return json_response(company(user_id))
+
+
+@app.route('/students')
+def get_students():
+    count = app.config['STUDENTS']
+    return json_response(cached_payload('students', lambda: [student(n) for n in range(1, count + 1)]))
+
+
+@app.route('/jobs')
+def get_jobs():
+    count = app.config['JOBS']
+    if count == 0:
+        return '', 404
+    return json_response(cached_payload('jobs', lambda: [job(n) for n in range(1, count + 1)]))
+
+
+@app.route('/job')
+def get_job():
+    job_id = user_id_arg('jobID')
+    if job_id is None:
+        return 'Job not found', 404
+    return json_response(job(job_id))
+
+
+@app.route('/post_job', methods=['POST'])
+@app.route('/register', methods=['POST'])
+def created():
+    return json_response({'message': 'created'}, status=201)
+
+
+@app.route('/apply_for_job', methods=['POST'])
+@app.route('/student_registration', methods=['POST'])
+@app.route('/company_registration', methods=['POST'])
+@app.route('/forgot_password', methods=['POST'])
+@app.route('/change_password', methods=['POST'])
+@app.route('/edit_company', methods=['PUT'])
+@app.route('/edit_education', methods=['PUT'])
+@app.route('/edit_student_job', methods=['PUT'])
+@app.route('/edit_profile_batch', methods=['PUT'])
+@app.route('/verify_email')
+def accepted():
+    return json_response({'message': 'ok'})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--jobs', type=int, default=50, help='number of job posts returned by /jobs')
+    parser.add_argument('--students', type=int, default=200, help='number of students returned by /students')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='fixed delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='random extra delay, uniform in [0, jitter]')
+    args = parser.parse_args()
+    app.config.update(JOBS=args.jobs, STUDENTS=args.students,
+                      LATENCY_MS=args.latency_ms, JITTER_MS=args.jitter_ms)
+    app.run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,61 @@
+"""Stand-in for the Anthropic Messages API, for benchmarking campus-cv locally.
+
+Answers POST /v1/messages with a fixed CV in the section layout create_pdf()
+expects, after a configurable delay.
+
+    python fake_llm.py --port 8081 --latency-ms 3000
+    LLM_BASE_URL=http://localhost:8081 flask --app main run --port 3000   # in campus-cv
+"""
+import argparse
+import time
+import uuid
+from flask import Flask, jsonify, request
+
+
+app = Flask(__name__)
+app.config.update(LATENCY_MS=0.0)
+
+CV_TEXT = """Email: student@bench.local
+
+Objective:
+Motivated computer science graduate seeking a junior developer role.
+
+Education:
+BSc in Computer Science, University 0 (2019 - 2023)
+Graduated with honours.
+Relevant coursework: algorithms, databases, distributed systems.
+
+Experience:
+Intern, Company 0 (Jan 2021 - Jun 2021)
+Built internal tools in Python and SQL.
+Automated reporting, saving the team several hours a week.
+
+Skills:
+Python, Flask, SQL, Git, Docker, teamwork, communication."""
+
+
+@app.route('/v1/messages', methods=['POST'])
+def messages():
+    if app.config['LATENCY_MS'] > 0:
+        time.sleep(app.config['LATENCY_MS'] / 1000)
+    body = request.json or {}
+    return jsonify({
+        'id': f'msg_{uuid.uuid4().hex}',
+        'type': 'message',
+        'role': 'assistant',
+        'model': body.get('model', 'fake'),
+        'content': [{'type': 'text', 'text': CV_TEXT}],
+        'stop_reason': 'end_turn',
+        'stop_sequence': None,
+        'usage': {'input_tokens': 400, 'output_tokens': 250},
+    })
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay before every response')
+    args = parser.parse_args()
+    app.config.update(LATENCY_MS=args.latency_ms)
+    app.run(host=args.host, port=args.port, threaded=True)
@@ -0,0 +1,131 @@
+"""Stand-in for a Redis server, for running campus-front's shared store locally.
+
+Speaks enough of the Redis protocol (RESP) for store.RedisStore: PING, AUTH,
+SELECT, GET, SET (with EX/PX), DEL, EXISTS, DBSIZE and FLUSHDB, with an
+optional delay per command to mimic a remote server.
+
+    python fake_redis.py --port 6379 --latency-ms 1
+    SECRET_KEY=dev STORE_URL=redis://localhost:6379/0 flask --app main run   # in campus-front
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class Database:
+    def __init__(self):
+        self.entries = {}  # key -> (expires or None, value)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] is not None and entry[0] <= time.monotonic():
+                del self.entries[key]
+                entry = None
+            return entry[1] if entry else None
+
+
+databases = {}
+databases_lock = threading.Lock()
+
+
+def database(index):
+    with databases_lock:
+        return databases.setdefault(index, Database())
+
+
+def encode(reply):
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, bytes):
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+    if isinstance(reply, Exception):
+        return b'-ERR %s\r\n' % str(reply).encode()
+    return b'+%s\r\n' % reply.encode()
+
+
+class Handler(socketserver.StreamRequestHandler):
+    latency = 0.0
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.split()  # inline command, e.g. from telnet
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        db = database(0)
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            if not args:
+                continue
+            if self.latency:
+                time.sleep(self.latency)
+            name, args = args[0].upper(), args[1:]
+            try:
+                if name == b'SELECT':
+                    db = database(int(args[0]))
+                    reply = 'OK'
+                else:
+                    reply = self.run(db, name, args)
+            except (IndexError, ValueError) as e:
+                reply = ValueError(f'wrong arguments for {name.decode().lower()}: {e}')
+            self.wfile.write(encode(reply))
+
+    def run(self, db, name, args):
+        if name == b'PING':
+            return 'PONG'
+        if name == b'AUTH':
+            return 'OK'
+        if name == b'GET':
+            return db.get(args[0])
+        if name == b'SET':
+            expires = None
+            options = [arg.upper() for arg in args[2:]]
+            if b'EX' in options:
+                expires = time.monotonic() + int(args[2 + options.index(b'EX') + 1])
+            if b'PX' in options:
+                expires = time.monotonic() + int(args[2 + options.index(b'PX') + 1]) / 1000
+            with db.lock:
+                db.entries[args[0]] = (expires, args[1])
+            return 'OK'
+        if name == b'DEL':
+            with db.lock:
+                return sum(db.entries.pop(key, None) is not None for key in args)
+        if name == b'EXISTS':
+            return sum(db.get(key) is not None for key in args)
+        if name == b'DBSIZE':
+            return len(db.entries)
+        if name == b'FLUSHDB':
+            with db.lock:
+                db.entries.clear()
+            return 'OK'
+        return ValueError(f"unknown command '{name.decode()}'")
+
+
+class Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay before every reply')
+    args = parser.parse_args()
+    Handler.latency = args.latency_ms / 1000
+    with Server((args.host, args.port), Handler) as server:
+        server.serve_forever()
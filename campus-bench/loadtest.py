@@ -0,0 +1,200 @@
+"""Scripted load scenarios against campus-front and campus-cv.
+
+Run the front against fake_api.py (and campus-cv against fake_llm.py), with
+RATE_LIMIT_ENABLED=false and MAX_IN_FLIGHT=0 so its limiter does not turn the
+load into 429/503s (and any SECRET_KEY), then:
+
+    python loadtest.py --scenario all --concurrency 16 --duration 30
+
+Scenarios:
+    anonymous  GET / without a session (jobs list only)
+    student    GET / as a logged-in student (user_details + jobs not applied)
+    company    GET / as a logged-in company (user_details + all students from /students;
+               size the list with fake_api.py --students N)
+    cv         POST /generate-cv straight to campus-cv (LLM + PDF + students update;
+               needs a Postgres with the students table, e.g. docker compose up postgres;
+               one probe request is sent first and the run stops if it fails)
+
+Each scenario reports p50/p95/p99 latency and requests/sec; --json writes the
+same numbers to a file so runs can be diffed for regressions.
+"""
+import argparse
+import json
+import threading
+import time
+import requests
+
+
+#######################################################################################
+#                                  Results                                            #
+#######################################################################################
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(name, latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        'scenario': name,
+        'requests': total,
+        'errors': errors,
+        'rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def print_report(results):
+    width = max([12] + [len(r['scenario']) + 2 for r in results])
+    print(f"{'scenario':<{width}}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['scenario']:<{width}}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+
+#######################################################################################
+#                                  Scenarios                                          #
+#######################################################################################
+
+CV_USER_DETAILS = {
+    'id': '1', 'email': 'student1@bench.local', 'fname': 'Student 1', 'role': 'student',
+    'is_cv_created': 'false', 'cv_path': '', 'description': 'Computer science student.',
+    'jobs': [{'title': 'Intern', 'company': 'Company 0', 'startDate': '01, 2021',
+              'endDate': '06, 2021', 'description': 'Built internal tools.'}],
+    'education': [{'school': 'University 0', 'degree': 'BSc', 'fieldOfStudy': 'Computer Science',
+                   'startDate': '10, 2019', 'endDate': '06, 2023', 'description': 'Honours.'}],
+}
+
+
+def login(front_url, email):
+    session = requests.Session()
+    response = session.post(f'{front_url}/login', data={'email': email, 'password': 'bench'},
+                            allow_redirects=False)
+    if response.status_code != 302:
+        raise RuntimeError(f'login as {email} failed with {response.status_code}')
+    return session
+
+
+def scenario_anonymous(args, worker):
+    session = requests.Session()
+    return lambda: session.get(f'{args.front_url}/')
+
+
+def scenario_student(args, worker):
+    session = login(args.front_url, f'student{worker + 1}@bench.local')
+    return lambda: session.get(f'{args.front_url}/')
+
+
+def scenario_company(args, worker):
+    session = login(args.front_url, f'company{worker + 1}@bench.local')
+    return lambda: session.get(f'{args.front_url}/')
+
+
+def scenario_cv(args, worker):
+    session = requests.Session()
+    payload = {'user_id': str(worker + 1), 'user_details': CV_USER_DETAILS}
+    return lambda: session.post(f'{args.cv_url}/generate-cv', json=payload)
+
+
+def check_cv(args):
+    """Send one /generate-cv before the load. Without Postgres every request is a 500,
+    which would otherwise be counted as load errors."""
+    payload = {'user_id': '1', 'user_details': CV_USER_DETAILS}
+    try:
+        response = requests.post(f'{args.cv_url}/generate-cv', json=payload, timeout=120)
+    except requests.RequestException as e:
+        raise RuntimeError(f'campus-cv is not reachable at {args.cv_url}: {e}')
+    if response.status_code == 500 and 'Failed to update student CV details' in response.text:
+        raise RuntimeError('campus-cv could not update the students table: the cv scenario needs '
+                           'a Postgres with the students table (e.g. docker compose up postgres)')
+    if response.status_code >= 400:
+        raise RuntimeError(f'campus-cv answered the probe /generate-cv with {response.status_code}: '
+                           f'{response.text[:200]}')
+
+
+SCENARIOS = {
+    'anonymous': scenario_anonymous,
+    'student': scenario_student,
+    'company': scenario_company,
+    'cv': scenario_cv,
+}
+
+# Run once before a scenario's load; they raise RuntimeError when it cannot succeed
+CHECKS = {
+    'cv': check_cv,
+}
+
+#######################################################################################
+#                                  Runner                                             #
+#######################################################################################
+
+def run_scenario(name, args):
+    if name in CHECKS:
+        CHECKS[name](args)
+    latencies, lock = [], threading.Lock()
+    errors = [0]
+    deadline = time.monotonic() + args.duration
+    remaining = [args.requests]
+
+    def take_ticket():
+        with lock:
+            if args.requests:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+            return time.monotonic() < deadline
+
+    def worker(index):
+        send = SCENARIOS[name](args, index)
+        while take_ticket():
+            start = time.perf_counter()
+            try:
+                ok = send().status_code < 400
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(name, latencies, errors[0], time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--front-url', default='http://localhost:5000')
+    parser.add_argument('--cv-url', default='http://localhost:3000')
+    parser.add_argument('--scenario', choices=[*SCENARIOS, 'all'], default='all')
+    parser.add_argument('--concurrency', type=int, default=8, help='parallel clients')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per scenario')
+    parser.add_argument('--requests', type=int, default=0, help='stop after this many requests (0 = no limit)')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    # "all" leaves out the cv scenario, which needs campus-cv and Postgres running.
+    names = ['anonymous', 'student', 'company'] if args.scenario == 'all' else [args.scenario]
+    try:
+        results = [run_scenario(name, args) for name in names]
+    except RuntimeError as e:
+        parser.exit(1, f'{e}\n')
+    print_report(results)
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump(results, out, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Compare campus-cv's PDF output modes: size on disk and render time.
+
+Renders the same CV (fake_llm.py's text, fake_api.py's student) with the full-size
+icons (PDF_OPTIMIZE=false, the original output) and with the optimized mode, and
+reports the file size and create_pdf() timings of each.
+
+    python pdf_bench.py --renders 50
+    python pdf_bench.py --renders 50 --icon-dpi 300 --keep /tmp/cv-pdfs
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CV_DIR = os.path.join(HERE, '..', 'campus-cv')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--renders', type=int, default=50, help='PDFs rendered per mode')
+    parser.add_argument('--icon-dpi', type=int, default=None, help='override ICON_DPI for the optimized mode')
+    parser.add_argument('--keep', help='directory to keep one PDF per mode in')
+    args = parser.parse_args()
+
+    # campus-cv reads its config at import; no warm-up thread or real icon path needed here
+    os.environ.setdefault('WARMUP', 'false')
+    os.environ.setdefault('ICONS_PATH', os.path.join(CV_DIR, 'icons'))
+    if args.icon_dpi:
+        os.environ['ICON_DPI'] = str(args.icon_dpi)
+    sys.path.insert(0, CV_DIR)
+    import main as cv
+    from fake_api import student
+    from fake_llm import CV_TEXT
+
+    user_details = student(1)
+    out_dir = args.keep or tempfile.mkdtemp()
+    os.makedirs(out_dir, exist_ok=True)
+
+    print(f"{'mode':<10} {'bytes':>8} {'mean ms':>9} {'p95 ms':>9}  first render ms")
+    for mode, optimize in (('original', False), ('optimized', True)):
+        path = os.path.join(out_dir, f'student_cv_{mode}.pdf')
+        timings = []
+        for _ in range(args.renders):
+            start = time.perf_counter()
+            cv.create_pdf(CV_TEXT, path, user_details, cv.ICONS_PATH, optimize=optimize)
+            timings.append((time.perf_counter() - start) * 1000)
+        steady = sorted(timings[1:]) or timings
+        p95 = steady[min(len(steady) - 1, int(len(steady) * 0.95))]
+        print(f'{mode:<10} {os.path.getsize(path):>8} {statistics.mean(steady):>9.2f} {p95:>9.2f}  {timings[0]:.2f}')
+    print(f'PDFs in {out_dir}')
+
+
+if __name__ == '__main__':
+    main()
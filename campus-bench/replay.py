@@ -0,0 +1,129 @@
+"""Replay traffic captured by campus-front (CAPTURE_FILE) against a front instance.
+
+Capture in production or staging:
+
+    CAPTURE_FILE=/var/log/front-capture.jsonl CAPTURE_SALT=... flask run
+
+then replay against a front that talks to fake_api.py (all replayed users share
+one IP, so start it with RATE_LIMIT_ENABLED=false):
+
+    python replay.py --capture front-capture.jsonl --speed 1     # original pacing
+    python replay.py --capture front-capture.jsonl --speed 4     # 4x faster
+    python replay.py --capture front-capture.jsonl --speed max   # as fast as --concurrency allows
+
+Only GET page views are replayed; form posts carry scrubbed values and are
+skipped (use loadtest.py for those flows). Each captured (pseudonymous) user
+gets its own logged-in session, as a student or company according to the role
+seen during capture, so per-user access patterns and cache locality survive.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from fake_api import COMPANY_ID_BASE
+from loadtest import login, print_report, summarize
+
+
+SKIPPED_ROUTES = {'/login', '/logout', '/metrics'}
+
+
+def load_inbound(path):
+    records = []
+    with open(path) as capture_file:
+        for line in capture_file:
+            record = json.loads(line)
+            if record.get('type') == 'inbound':
+                records.append(record)
+    records.sort(key=lambda r: r['ts'])
+    return records
+
+
+def build_path(record):
+    def substitute(match):
+        value = int(record['view_args'][match.group(1)])
+        if record['route'].startswith('/company/'):
+            value += COMPANY_ID_BASE
+        return str(value)
+    return re.sub(r'<(?:\w+:)?(\w+)>', substitute, record['route'])
+
+
+class Sessions:
+    """One requests.Session per captured user, logged in on first use."""
+
+    def __init__(self, front_url):
+        self.front_url = front_url
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def get(self, record):
+        key = (record['user'], record['role'])
+        with self.lock:
+            if key not in self.sessions:
+                if record['user'] is None:
+                    self.sessions[key] = requests.Session()
+                else:
+                    kind = 'company' if record['role'] == 'company' else 'student'
+                    self.sessions[key] = login(self.front_url, f"{kind}{record['user']}@bench.local")
+            return self.sessions[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--capture', required=True, help='JSONL file written by campus-front capture mode')
+    parser.add_argument('--front-url', default='http://localhost:5000')
+    parser.add_argument('--speed', default='1', help="playback speed multiplier, or 'max'")
+    parser.add_argument('--concurrency', type=int, default=32, help='maximum requests in flight')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    records = [r for r in load_inbound(args.capture)
+               if r['method'] == 'GET' and r['route'] not in SKIPPED_ROUTES]
+    if not records:
+        parser.error('no replayable GET requests in the capture file')
+    speed = None if args.speed == 'max' else float(args.speed)
+    sessions = Sessions(args.front_url)
+    results, lock = {}, threading.Lock()
+
+    def send(record):
+        start = time.perf_counter()
+        try:
+            response = sessions.get(record).get(f'{args.front_url}{build_path(record)}',
+                                                params=record['query'], allow_redirects=False)
+            ok = response.status_code < 400
+        except (requests.RequestException, RuntimeError):
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies, errors = results.setdefault(record['route'], ([], [0]))
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+
+    first_ts = records[0]['ts']
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for record in records:
+            if speed:
+                delay = (record['ts'] - first_ts) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(send, record)
+    elapsed = time.perf_counter() - start
+
+    report = [summarize(route, latencies, errors[0], elapsed)
+              for route, (latencies, errors) in sorted(results.items())]
+    report.append(summarize('total', [l for ls, _ in results.values() for l in ls],
+                            sum(e[0] for _, e in results.values()), elapsed))
+    print(f'replayed {len(records)} requests at speed {args.speed}')
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as out:
+            json.dump(report, out, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import math
+import os
+import zlib
+from fpdf import FPDF
+
+
+#######################################################################################
+#                                         Config                                      #
+#######################################################################################
+
+# The section icons are drawn 8mm wide but shipped at up to 920px (about 2900 dpi).
+# The optimized PDF mode resamples them to ICON_DPI at their printed size.
+ICON_DPI = int(os.environ.get('ICON_DPI', '200'))
+
+#######################################################################################
+#                                         PNG Resampling                              #
+#######################################################################################
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _unfilter(raw, height, stride, bpp):
+    """Undo the per-row PNG filters; returns the rows as bytearrays."""
+    rows = []
+    previous = bytearray(stride)
+    pos = 0
+    for _ in range(height):
+        kind = raw[pos]
+        row = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        if kind == 1:
+            for i in range(bpp, stride):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif kind == 2:
+            for i in range(stride):
+                row[i] = (row[i] + previous[i]) & 0xFF
+        elif kind == 3:
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + previous[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                left = row[i - bpp] if i >= bpp else 0
+                up_left = previous[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + _paeth(left, previous[i], up_left)) & 0xFF
+        rows.append(row)
+        previous = row
+    return rows
+
+
+def _resample(info, width, height):
+    """Nearest-neighbour resample of a parsed PNG, keeping its colour space and depth.
+
+    Nearest neighbour keeps palette images exact (no new colours), which suits flat
+    icons. The rows are written with PNG filter 0, so the /Predictor 15 decode
+    parameters stay valid with the new /Columns.
+    """
+    colors = 3 if info['cs'] == 'DeviceRGB' else 1
+    bpc = info['bpc']
+    bits = colors * bpc
+    stride = (info['w'] * bits + 7) // 8
+    rows = _unfilter(zlib.decompress(info['data']), info['h'], stride, max(1, bits // 8))
+
+    out_stride = (width * bits + 7) // 8
+    xs = [int((x + 0.5) * info['w'] / width) for x in range(width)]
+    data = bytearray()
+    for y in range(height):
+        row = rows[int((y + 0.5) * info['h'] / height)]
+        data.append(0)
+        if bits >= 8:
+            size = bits // 8
+            for x in xs:
+                data += row[x * size:(x + 1) * size]
+        else:
+            packed = bytearray(out_stride)
+            mask = (1 << bpc) - 1
+            for out_x, x in enumerate(xs):
+                sample = (row[x * bpc // 8] >> (8 - bpc - x * bpc % 8)) & mask
+                packed[out_x * bpc // 8] |= sample << (8 - bpc - out_x * bpc % 8)
+            data += packed
+    resized = dict(info, w=width, h=height, data=zlib.compress(bytes(data), 9))
+    resized['dp'] = f"/Predictor 15 /Colors {colors} /BitsPerComponent {bpc} /Columns {width}"
+    return resized
+
+
+def load_icon(path, width_mm=None, dpi=ICON_DPI):
+    """fpdf image info for a PNG icon, resampled to `dpi` at `width_mm` when that is smaller.
+
+    Images with an alpha channel (fpdf keeps those as a separate soft mask) are
+    returned as they are.
+    """
+    info = FPDF()._parsepng(path)
+    if width_mm is None or 'smask' in info:
+        return info
+    width = max(1, math.ceil(width_mm / 25.4 * dpi))
+    if width >= info['w']:
+        return info
+    height = max(1, round(info['h'] * width / info['w']))
+    return _resample(info, width, height)
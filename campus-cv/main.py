@@ -1,31 +1,82 @@
+import warmup
+warmup.track_imports()
 from flask import Flask, request, send_from_directory
+import logging
 import anthropic
 import json
 from fpdf import FPDF
 import os
+import shutil
+import threading
 import psycopg2
+import psycopg2.pool
+import icons
+import metrics
+import pregen
+import resilience
+import tracing
+warmup.stop_tracking_imports()
 
 #######################################################################################
 #                                         Config                                      #
 #######################################################################################
 
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s %(levelname)s %(name)s %(threadName)s [%(request_id)s] : %(message)s')
+tracing.install_log_filter()
+
 app = Flask(__name__)
+metrics.init_app(app)
+tracing.init_app(app)
 
 ICONS_PATH = os.environ.get('ICONS_PATH', '/campus-hire/project/campus-cv/icons')
 PDF_DIR = os.environ.get('PDF_DIR', '/campus-hire/project/campus-cv/cvs')
 API_KEY = os.environ.get('API_KEY', 'apikey')
+LLM_BASE_URL = os.environ.get('LLM_BASE_URL')  # None means the public Anthropic API
 DB_HOST = os.environ.get('DB_HOST', 'db-host')
 DB_PORT = os.environ.get('DB_PORT', '5432')
 DB_NAME = os.environ.get('DB_NAME', 'your_database_name')
 DB_USER = os.environ.get('DB_USER', 'your_database_user')
 DB_PASSWORD = os.environ.get('DB_PASSWORD', 'your_database_password')
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '4'))
+# Optimized output: icons resampled to icons.ICON_DPI instead of embedded at full size.
+PDF_OPTIMIZE = os.environ.get('PDF_OPTIMIZE', 'true').lower() == 'true'
+ICON_WIDTH = 8  # mm
+
+# Typographic characters LLM output likes, spelled with what the core fonts (latin-1) have
+PDF_TEXT_REPLACEMENTS = str.maketrans({
+    '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+    '\u2013': '-', '\u2014': '-', '\u2022': '-', '\u2026': '...', '\u00a0': ' ',
+})
+
+ICONS = {
+    "Email": "icon_email.png",
+    "Objective": "icon_objective.png",
+    "Education": "icon_education.png",
+    "Experience": "icon_experience.png",
+    "Skills": "icon_skills.png"
+}
+
+# One client for the whole process, so the HTTP connection pool is reused across CVs.
+llm_client = anthropic.Anthropic(api_key=API_KEY, base_url=LLM_BASE_URL,
+                                 timeout=resilience.LLM_TIMEOUT, max_retries=resilience.LLM_MAX_RETRIES)
+llm_breaker = resilience.CircuitBreaker('llm')
+
+# Opened on first use or during warm-up. ThreadedConnectionPool raises instead of
+# waiting when every connection is taken, so callers queue on the semaphore first.
+db_pool = None
+db_pool_lock = threading.Lock()
+db_slots = threading.BoundedSemaphore(DB_POOL_SIZE)
+
+# (icon path, optimized) -> image info parsed by fpdf, shared by every PDF this process writes
+icon_cache = {}
 
 #######################################################################################
 #                                         Helpers                                     #
 #######################################################################################
 
+@metrics.timed('generate_cv')
 def generate_cv(user_details):
-    client = anthropic.Anthropic(api_key=API_KEY)
     prompt = (
         "Hi! Our application is a job search platform designed specifically for students. "
         "We aim to create a professional and impactful CV that stands out to HR professionals. "
@@ -36,38 +87,59 @@ def generate_cv(user_details):
         "Here are the student's details:\n"
         f"{json.dumps(user_details, indent=2)}"
     )    
-    message = client.messages.create(
+    message = llm_client.messages.create(
         model="claude-3-opus-20240229",
         max_tokens=1000,
         temperature=0,
+        extra_headers={tracing.REQUEST_ID_HEADER: tracing.current_request_id()},
         messages=[{"role": "user", "content": [{"type": "text", "text": prompt}]}]
     )
     cv_content = message.content[0].text
     return cv_content
 
+def icon_info(path, optimize=PDF_OPTIMIZE):
+    info = icon_cache.get((path, optimize))
+    if info is None:
+        info = icon_cache[(path, optimize)] = icons.load_icon(path, ICON_WIDTH if optimize else None)
+    return info
+
+def pdf_text(text):
+    # Core fonts are not embedded but only cover latin-1; fpdf fails on anything else
+    return text.translate(PDF_TEXT_REPLACEMENTS).encode('latin-1', 'replace').decode('latin-1')
+
 class PDF(FPDF):
-    def __init__(self, user_details, icons_path):
+    def __init__(self, user_details, icons_path, optimize=PDF_OPTIMIZE):
         super().__init__()
         self.user_details = user_details
         self.icons_path = icons_path
+        self.optimize = optimize
+        self.set_compression(True)
+
+    def image(self, name, *args, **kwargs):
+        # Reuse the decoded icon instead of parsing the PNG again for every CV. fpdf
+        # embeds each image name once per document, however often it is drawn.
+        if name not in self.images:
+            self.images[name] = dict(icon_info(name, self.optimize), i=len(self.images) + 1)
+        super().image(name, *args, **kwargs)
 
     def header(self):
         last_education = self.user_details['education'][-1] if self.user_details['education'] else {}
         title = f"{self.user_details['fname']} - {last_education.get('degree', '')} in {last_education.get('fieldOfStudy', '')} at {last_education.get('school', '')}"
         self.set_font('Arial', 'B', 12)
-        self.cell(0, 10, title, 0, 1, 'C')
+        self.cell(0, 10, pdf_text(title), 0, 1, 'C')
         self.ln(5)
 
     def section_title(self, title, icon=None):
         if icon:
-            self.image(f"{self.icons_path}/{icon}", x=10, y=self.get_y(), w=8)
+            self.image(f"{self.icons_path}/{icon}", x=10, y=self.get_y(), w=ICON_WIDTH)
             self.set_x(self.get_x() + 10)
         self.set_fill_color(220, 220, 220)
         self.set_font('Arial', 'B', 10)
-        self.cell(0, 8, title, 0, 1, 'L', 1)
+        self.cell(0, 8, pdf_text(title), 0, 1, 'L', 1)
         self.ln(4)
 
     def section_body(self, body, is_subsection=False, is_email=False):
+        body = pdf_text(body)
         if is_email:
             self.set_font('Arial', '', 9)
             self.multi_cell(0, 6, body, 0, 'C')
@@ -79,25 +151,18 @@ class PDF(FPDF):
             self.multi_cell(0, 6, body)
         self.ln(2)
 
-def create_pdf(cv_content, file_path, user_details, icons_path):
-    pdf = PDF(user_details, icons_path)
+@metrics.timed('create_pdf')
+def create_pdf(cv_content, file_path, user_details, icons_path, optimize=PDF_OPTIMIZE):
+    pdf = PDF(user_details, icons_path, optimize)
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
 
-    icons = {
-        "Email": "icon_email.png",
-        "Objective": "icon_objective.png",
-        "Education": "icon_education.png",
-        "Experience": "icon_experience.png",
-        "Skills": "icon_skills.png"
-    }
-
     sections = cv_content.split('\n\n')
     for section in sections:
         title, body = section.split('\n', 1) if '\n' in section else (section, '')
-        icon = icons.get(title.split(':')[0], None)
+        icon = ICONS.get(title.split(':')[0], None)
         if title.startswith("Email"):
-            pdf.section_title(title, icon=icons["Email"])
+            pdf.section_title(title, icon=ICONS["Email"])
             pdf.section_body(body, is_email=True)
         elif title.startswith("Education") or title.startswith("Experience"):
             pdf.section_title(title, icon=icon)
@@ -110,28 +175,61 @@ def create_pdf(cv_content, file_path, user_details, icons_path):
             pdf.section_body(body)
 
     pdf.output(file_path)
+    size = os.path.getsize(file_path)
+    metrics.PDF_SIZE.observe(size)
+    app.logger.info(f"Wrote {file_path}: {size} bytes")
+
+def get_db_pool():
+    global db_pool
+    with db_pool_lock:
+        if db_pool is None:
+            db_pool = psycopg2.pool.ThreadedConnectionPool(
+                1, DB_POOL_SIZE,
+                host=DB_HOST,
+                port=DB_PORT,
+                dbname=DB_NAME,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                connect_timeout=resilience.DB_CONNECT_TIMEOUT
+            )
+        return db_pool
 
+@metrics.timed('update_student_cv')
 def update_student_cv(user_id, cv_path):
+    with db_slots:
+        conn = None
+        try:
+            pool = get_db_pool()
+            conn = pool.getconn()
+            with conn.cursor() as cur:
+                cur.execute(
+                    "UPDATE students SET is_cv_created = %s, cv_path = %s WHERE user_id = %s " + tracing.sql_comment(),
+                    (True, cv_path, user_id)
+                )
+            conn.commit()
+            pool.putconn(conn)
+            return True
+        except Exception as e:
+            if conn is not None:
+                # The connection may be broken (e.g. postgres restarted); don't hand it out again
+                pool.putconn(conn, close=True)
+            metrics.STEP_ERRORS.labels('update_student_cv').inc()
+            app.logger.error(f"Error updating student CV: {e}")
+            return False
+
+def pregenerate_pdf(user_details, file_path):
+    # Background builds report to the same breaker as foreground ones, but never call
+    # allow(): pregenerator.can_run keeps them away from a half-open LLM.
     try:
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD
-        )
-        cur = conn.cursor()
-        cur.execute(
-            "UPDATE students SET is_cv_created = %s, cv_path = %s WHERE user_id = %s",
-            (True, cv_path, user_id)
-        )
-        conn.commit()
-        cur.close()
-        conn.close()
-        return True
-    except Exception as e:
-        print(f"Error updating student CV: {e}")
-        return False
+        cv_content = generate_cv(user_details)
+    except (anthropic.APIConnectionError, anthropic.InternalServerError, anthropic.RateLimitError):
+        llm_breaker.record_failure()
+        raise
+    llm_breaker.record_success()
+    create_pdf(cv_content, file_path, user_details, ICONS_PATH)
+
+pregenerator = pregen.Pregenerator(pregenerate_pdf, os.path.join(PDF_DIR, 'pregen'),
+                                   can_run=lambda: llm_breaker.state == resilience.CLOSED)
 
 #######################################################################################
 #                                         Routes                                      #
@@ -151,8 +249,37 @@ def generate_cv_pdf():
     # Ensure the PDF directory exists
     os.makedirs(PDF_DIR, exist_ok=True)
     
+    # A background build for exactly these details makes the LLM and PDF steps unnecessary
+    ready_path = pregenerator.lookup(user_id, user_details, wait=resilience.PREGEN_WAIT)
+    if ready_path:
+        shutil.copyfile(ready_path, file_path)
+        if update_student_cv(user_id, f"/static/assets/pdf/cv/{file_name}"):
+            return send_from_directory(PDF_DIR, file_name, as_attachment=True)
+        return {"message": "Failed to update student CV details"}, 500
+    pregenerator.discard(user_id)
+
+    # Fail fast while the LLM is known to be down instead of tying up a worker
+    if not llm_breaker.allow():
+        return {"message": "CV generation is temporarily unavailable"}, 503
+
     # Generate CV content
-    cv_content = generate_cv(user_details)
+    try:
+        cv_content = generate_cv(user_details)
+    except (anthropic.APIConnectionError, anthropic.InternalServerError, anthropic.RateLimitError) as e:
+        if isinstance(e, anthropic.APITimeoutError):
+            resilience.TIMEOUTS.labels('llm').inc()
+        llm_breaker.record_failure()
+        app.logger.error(f"CV generation failed: {e}")
+        return {"message": "CV generation is temporarily unavailable"}, 503
+    except anthropic.APIStatusError:
+        # A 4xx is our request's fault, not the LLM's health
+        llm_breaker.record_success()
+        raise
+    except Exception:
+        # Anything else (e.g. a reply without content) still ends the half-open trial
+        llm_breaker.record_failure()
+        raise
+    llm_breaker.record_success()
     
     # Create the PDF
     create_pdf(cv_content, file_path, user_details, ICONS_PATH)
@@ -161,4 +288,25 @@ def generate_cv_pdf():
     if update_student_cv(user_id, f"/static/assets/pdf/cv/{file_name}"):
         return send_from_directory(PDF_DIR, file_name, as_attachment=True)
     else:
-        return {"message": "Failed to update student CV details"}, 500
\ No newline at end of file
+        return {"message": "Failed to update student CV details"}, 500
+
+@app.route('/schedule-cv', methods=['POST'])
+def schedule_cv():
+    # Called by campus-front after a student's profile changes; the build runs later
+    data = request.json
+    if pregenerator.schedule(data['user_id'], data['user_details']):
+        return {"message": "CV regeneration scheduled"}, 202
+    return {"message": "Too many CV regenerations pending"}, 429
+
+#######################################################################################
+#                                         Warm-up                                     #
+#######################################################################################
+
+def load_icons():
+    for file_name in ICONS.values():
+        icon_info(f"{ICONS_PATH}/{file_name}")
+
+warmup.init_app(app, 'cv', [
+    ('icons', load_icons),
+    ('database pool', get_db_pool),
+])
@@ -0,0 +1,80 @@
+import functools
+import time
+from flask import Response, g, request
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# The request hooks mirror campus-front/metrics.py under this service's metric names.
+
+
+#######################################################################################
+#                                         Metrics                                     #
+#######################################################################################
+
+# A CV request is dominated by the LLM call, which can take tens of seconds.
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REQUEST_COUNT = Counter('cv_http_requests_total',
+                        'Requests handled, by Flask route.',
+                        ['route', 'method', 'status'])
+REQUEST_ERRORS = Counter('cv_http_request_errors_total',
+                         'Requests that ended with a 5xx response, by Flask route.',
+                         ['route', 'method'])
+REQUEST_LATENCY = Histogram('cv_http_request_duration_seconds',
+                            'Time spent handling a request, by Flask route.',
+                            ['route', 'method'], buckets=LATENCY_BUCKETS)
+
+STEP_LATENCY = Histogram('cv_step_duration_seconds',
+                         'Time spent in each CV pipeline step (generate_cv, create_pdf, update_student_cv).',
+                         ['step'], buckets=LATENCY_BUCKETS)
+STEP_ERRORS = Counter('cv_step_errors_total',
+                      'CV pipeline steps that failed.',
+                      ['step'])
+PDF_SIZE = Histogram('cv_pdf_size_bytes',
+                     'Size of each CV PDF written.',
+                     buckets=(5000, 10000, 20000, 50000, 100000, 250000, 500000, 1000000))
+
+
+def timed(step):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                STEP_ERRORS.labels(step).inc()
+                raise
+            finally:
+                STEP_LATENCY.labels(step).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+#######################################################################################
+#                                         Flask Hooks                                 #
+#######################################################################################
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None or request.endpoint == 'metrics':
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    REQUEST_LATENCY.labels(route, request.method).observe(time.perf_counter() - start)
+    REQUEST_COUNT.labels(route, request.method, str(response.status_code)).inc()
+    if response.status_code >= 500:
+        REQUEST_ERRORS.labels(route, request.method).inc()
+    return response
+
+
+def metrics_view():
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,209 @@
+import collections
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import Counter, Gauge
+
+
+#######################################################################################
+#                                         Config                                      #
+#######################################################################################
+
+# A student usually fixes several entries in a row, so a rebuild waits until they have
+# been quiet for PREGEN_DELAY seconds; every new edit pushes it back.
+PREGEN_DELAY = float(os.environ.get('PREGEN_DELAY', '180'))
+PREGEN_WORKERS = int(os.environ.get('PREGEN_WORKERS', '2'))
+PREGEN_PER_HOUR = int(os.environ.get('PREGEN_PER_HOUR', '4'))
+PREGEN_MAX_PENDING = int(os.environ.get('PREGEN_MAX_PENDING', '1000'))
+PREGEN_NICE = int(os.environ.get('PREGEN_NICE', '10'))
+
+# Bookkeeping fields that change when a CV is saved but not what goes into it.
+DIGEST_IGNORED = {'cv_path', 'is_cv_created'}
+
+PREGEN_JOBS = Counter('cv_pregen_jobs_total',
+                      'Background CV regenerations, by outcome.',
+                      ['outcome'])
+PREGEN_PENDING = Gauge('cv_pregen_pending',
+                       'Students whose background regeneration is waiting out the debounce delay.')
+PREGEN_LOOKUPS = Counter('cv_pregen_lookups_total',
+                         'Foreground CV requests, by whether a pre-generated PDF was used.',
+                         ['result'])
+
+logger = logging.getLogger(__name__)
+
+
+def details_digest(user_details):
+    relevant = {key: value for key, value in user_details.items() if key not in DIGEST_IGNORED}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+
+
+def _lower_priority():
+    # Linux applies nice values per thread, so only the background workers are demoted.
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREGEN_NICE)
+    except (AttributeError, OSError):
+        pass
+
+#######################################################################################
+#                                         Pregenerator                                #
+#######################################################################################
+
+class Pregenerator:
+    """Debounced background CV builds, cached by a digest of the student's details.
+
+    `build(user_details, file_path)` produces the PDF. `schedule()` (re)starts the
+    debounce timer for a student; once it expires the latest details are built on a
+    pool of PREGEN_WORKERS low-priority threads, at most PREGEN_PER_HOUR times per
+    student per hour, and only while `can_run()` says the LLM is healthy. `lookup()`
+    then hands the foreground request a ready PDF for exactly those details.
+
+    State lives in this process, which matches campus-cv's single `flask run` server.
+    """
+
+    def __init__(self, build, directory, can_run=lambda: True, delay=PREGEN_DELAY, workers=PREGEN_WORKERS,
+                 per_hour=PREGEN_PER_HOUR, max_pending=PREGEN_MAX_PENDING):
+        self.build = build
+        self.directory = directory
+        self.can_run = can_run
+        self.delay = delay
+        self.per_hour = per_hour
+        self.max_pending = max_pending
+        self.cond = threading.Condition()
+        self.pending = {}  # user_id -> (due, user_details)
+        self.queued = set()  # (user_id, digest) submitted, waiting for a worker
+        self.running = {}  # (user_id, digest) -> Event set when the build ends
+        self.history = {}  # user_id -> start times within the last hour (scheduler thread only)
+        self.history_pruned = time.monotonic()
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='pregen', initializer=_lower_priority)
+        self.scheduler = None
+
+    def path_for(self, user_id, digest):
+        return os.path.join(self.directory, f'student_cv_{user_id}_{digest[:16]}.pdf')
+
+    def schedule(self, user_id, user_details):
+        user_id = str(user_id)
+        with self.cond:
+            if user_id not in self.pending and len(self.pending) >= self.max_pending:
+                PREGEN_JOBS.labels('rejected').inc()
+                return False
+            PREGEN_JOBS.labels('debounced' if user_id in self.pending else 'scheduled').inc()
+            self.pending[user_id] = (time.monotonic() + self.delay, user_details)
+            PREGEN_PENDING.set(len(self.pending))
+            if self.scheduler is None:
+                self.scheduler = threading.Thread(target=self._run_scheduler, name='pregen-scheduler', daemon=True)
+                self.scheduler.start()
+            self.cond.notify()
+        return True
+
+    def discard(self, user_id):
+        """Drop a pending rebuild, e.g. because the student is generating the CV right now."""
+        with self.cond:
+            if self.pending.pop(str(user_id), None) is not None:
+                PREGEN_PENDING.set(len(self.pending))
+
+    def lookup(self, user_id, user_details, wait=0):
+        """Path of a pre-generated PDF for exactly these details, or None.
+
+        A build of the same details that a worker has already started is waited for,
+        up to `wait` seconds, rather than started a second time. One still queued
+        behind other students' builds is not: the caller is better off building it.
+        """
+        key = (str(user_id), details_digest(user_details))
+        with self.cond:
+            done = self.running.get(key)
+        if done is not None:
+            done.wait(wait)
+        path = self.path_for(*key)
+        if os.path.exists(path):
+            PREGEN_LOOKUPS.labels('hit').inc()
+            return path
+        PREGEN_LOOKUPS.labels('miss').inc()
+        return None
+
+    def _run_scheduler(self):
+        while True:
+            with self.cond:
+                now = time.monotonic()
+                due = [user_id for user_id, (at, _) in self.pending.items() if at <= now]
+                if not due:
+                    next_due = min((at for at, _ in self.pending.values()), default=now + 60)
+                    self.cond.wait(next_due - now)
+                    continue
+                batch = [(user_id, self.pending.pop(user_id)[1]) for user_id in due]
+                PREGEN_PENDING.set(len(self.pending))
+            for user_id, user_details in batch:
+                self._start(user_id, user_details)
+
+    def _prune_history(self, now):
+        # Forget students without a build in the last hour, so that history holds only
+        # recent builders instead of everyone ever scheduled.
+        for user_id in [user_id for user_id, starts in self.history.items()
+                        if not starts or now - starts[-1] >= 3600]:
+            del self.history[user_id]
+        self.history_pruned = now
+
+    def _within_hourly_limit(self, user_id):
+        now = time.monotonic()
+        if now - self.history_pruned >= 60:
+            self._prune_history(now)
+        starts = self.history.setdefault(user_id, collections.deque())
+        while starts and now - starts[0] >= 3600:
+            starts.popleft()
+        if len(starts) >= self.per_hour:
+            return False
+        starts.append(now)
+        return True
+
+    def _start(self, user_id, user_details):
+        key = (user_id, details_digest(user_details))
+        path = self.path_for(*key)
+        with self.cond:
+            in_flight = key in self.queued or key in self.running
+        if in_flight or os.path.exists(path):
+            PREGEN_JOBS.labels('unchanged').inc()
+            return
+        if not self.can_run():
+            PREGEN_JOBS.labels('skipped').inc()
+            return
+        if not self._within_hourly_limit(user_id):
+            PREGEN_JOBS.labels('rate_limited').inc()
+            return
+        with self.cond:
+            self.queued.add(key)
+        self.executor.submit(self._build, key, user_details, path)
+
+    def _build(self, key, user_details, path):
+        # Only now is the build running, and worth waiting for in lookup()
+        done = threading.Event()
+        with self.cond:
+            self.queued.discard(key)
+            self.running[key] = done
+        try:
+            self._write(key[0], user_details, path)
+        finally:
+            with self.cond:
+                self.running.pop(key, None)
+            done.set()
+
+    def _write(self, user_id, user_details, path):
+        tmp_path = f'{path}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.build(user_details, tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            PREGEN_JOBS.labels('failed').inc()
+            logger.error(f"Background CV build for user {user_id} failed: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        PREGEN_JOBS.labels('generated').inc()
+        # Only the build for the latest details is worth keeping
+        for old_path in glob.glob(os.path.join(self.directory, f'student_cv_{user_id}_*.pdf')):
+            if old_path != path:
+                os.remove(old_path)
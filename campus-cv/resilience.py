@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from prometheus_client import Counter, Gauge
+
+
+#######################################################################################
+#                                         Config                                      #
+#######################################################################################
+
+# Keep LLM_TIMEOUT * (LLM_MAX_RETRIES + 1) under campus-front's CV_TIMEOUT (90s), or the
+# front gives up on a CV that is still being produced.
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', '40'))
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', '1'))
+# How long /generate-cv waits for a background build of the same details that has
+# already started. A miss then calls the LLM itself, so PREGEN_WAIT plus the LLM time
+# above must also stay under CV_TIMEOUT.
+PREGEN_WAIT = float(os.environ.get('PREGEN_WAIT', '5'))
+DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', '3'))
+
+BREAKER_FAILURES = int(os.environ.get('BREAKER_FAILURES', '3'))
+BREAKER_RESET = float(os.environ.get('BREAKER_RESET', '60'))
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = Gauge('cv_dependency_circuit_state',
+                      'Circuit breaker state per dependency (0 closed, 1 half-open, 2 open).',
+                      ['dependency'])
+BREAKER_REJECTED = Counter('cv_dependency_short_circuits_total',
+                           'Calls refused because the dependency breaker was open.',
+                           ['dependency'])
+TIMEOUTS = Counter('cv_dependency_timeouts_total',
+                   'Calls to a dependency that timed out.',
+                   ['dependency'])
+
+#######################################################################################
+#                                         Circuit Breaker                             #
+#######################################################################################
+
+# Same breaker as campus-front/resilience.py, with this service's metric names.
+class CircuitBreaker:
+    """Consecutive-failure breaker for one dependency.
+
+    After `failures` failed calls in a row the breaker opens and calls are refused
+    for `reset_after` seconds; then a single trial call is let through (half-open)
+    and its outcome closes or re-opens the breaker. A trial whose outcome is never
+    recorded is given up after another `reset_after`, so a caller that dies mid-call
+    cannot leave the breaker half-open for good.
+    """
+
+    def __init__(self, dependency, failures=BREAKER_FAILURES, reset_after=BREAKER_RESET):
+        self.dependency = dependency
+        self.failures = failures
+        self.reset_after = reset_after
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.trial_started = 0.0
+        BREAKER_STATE.labels(dependency).set(STATE_VALUES[CLOSED])
+
+    def _set_state(self, state):
+        self.state = state
+        BREAKER_STATE.labels(self.dependency).set(STATE_VALUES[state])
+
+    def allow(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_after:
+                self._set_state(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and (not self.trial_in_flight or now - self.trial_started >= self.reset_after):
+                self.trial_in_flight = True
+                self.trial_started = now
+                return True
+            BREAKER_REJECTED.labels(self.dependency).inc()
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failure_count = 0
+            self.trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            self.failure_count += 1
+            self.trial_in_flight = False
+            if self.state == HALF_OPEN or self.failure_count >= self.failures:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# The service modules are imported as top-level modules, as main.py does
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+# main.py reads its config at import: no warm-up thread, the repo's icons, scratch PDFs
+os.environ.setdefault('WARMUP', 'false')
+os.environ.setdefault('ICONS_PATH', os.path.join(HERE, '..', 'icons'))
+os.environ.setdefault('PDF_DIR', tempfile.mkdtemp(prefix='cv-tests-'))
@@ -0,0 +1,160 @@
+import os
+import random
+import struct
+import zlib
+import pytest
+from fpdf import FPDF
+from icons import _paeth, _resample, _unfilter, load_icon
+
+
+ICONS_PATH = os.environ['ICONS_PATH']
+
+
+# Reference encoder: the PNG filters applied forwards, as the spec defines them
+
+def pack_row(samples, bits):
+    if bits >= 8:
+        return bytes(b for sample in samples for b in sample.to_bytes(bits // 8, 'big'))
+    row = bytearray((len(samples) * bits + 7) // 8)
+    for i, sample in enumerate(samples):
+        row[i * bits // 8] |= sample << (8 - bits - i * bits % 8)
+    return bytes(row)
+
+
+def unpack_row(row, width, bits):
+    if bits >= 8:
+        size = bits // 8
+        return [int.from_bytes(row[i * size:(i + 1) * size], 'big') for i in range(width)]
+    mask = (1 << bits) - 1
+    return [(row[i * bits // 8] >> (8 - bits - i * bits % 8)) & mask for i in range(width)]
+
+
+def filter_row(kind, row, previous, bpp):
+    out = bytearray()
+    for i, value in enumerate(row):
+        left = row[i - bpp] if i >= bpp else 0
+        up = previous[i]
+        up_left = previous[i - bpp] if i >= bpp else 0
+        predictor = [0, left, up, (left + up) // 2, _paeth(left, up, up_left)][kind]
+        out.append((value - predictor) & 0xFF)
+    return bytes(out)
+
+
+def encode(rows, bpp, kinds):
+    raw, previous = bytearray(), bytes(len(rows[0]))
+    for row, kind in zip(rows, kinds):
+        raw += bytes([kind]) + filter_row(kind, row, previous, bpp)
+        previous = row
+    return bytes(raw)
+
+
+def write_png(path, pixels, color_type, depth, kinds):
+    """A PNG of `pixels` (rows of sample values; RGB pixels are flattened) with the
+    given filter type on each row."""
+    width = len(pixels[0]) // (3 if color_type == 2 else 1)
+    bits = depth * (3 if color_type == 2 else 1)
+    rows = [pack_row(samples, depth) for samples in pixels]
+    data = zlib.compress(encode(rows, max(1, bits // 8), kinds))
+
+    def chunk(name, body):
+        return struct.pack('>I', len(body)) + name + body + struct.pack('>I', zlib.crc32(name + body))
+    png = b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, len(pixels), depth, color_type, 0, 0, 0))
+    if color_type == 3:
+        png += chunk(b'PLTE', bytes(random.Random(0).randrange(256) for _ in range(3 << depth)))
+    path.write_bytes(png + chunk(b'IDAT', data) + chunk(b'IEND', b''))
+    return str(path)
+
+
+# (PNG colour type, bit depth): the shipped icons are 4-bit indexed; the others take
+# the byte-aligned and sub-byte branches
+FORMATS = [(3, 4), (3, 1), (3, 2), (3, 8), (0, 8), (2, 8)]
+
+
+def random_pixels(color_type, depth, width, height, seed=1):
+    rng = random.Random(seed)
+    samples = width * (3 if color_type == 2 else 1)
+    return [[rng.randrange(1 << depth) for _ in range(samples)] for _ in range(height)]
+
+
+def decoded(info):
+    """Sample rows of a parsed (filter 0 or filtered) PNG, via the reference unpacking."""
+    colors = 3 if info['cs'] == 'DeviceRGB' else 1
+    bits = colors * info['bpc']
+    stride = (info['w'] * bits + 7) // 8
+    rows = _unfilter(zlib.decompress(info['data']), info['h'], stride, max(1, bits // 8))
+    return [unpack_row(row, info['w'] * colors, info['bpc']) for row in rows]
+
+
+@pytest.mark.parametrize('color_type, depth', FORMATS)
+@pytest.mark.parametrize('kind', [0, 1, 2, 3, 4])
+def test_unfilter_undoes_each_filter_type(kind, color_type, depth):
+    pixels = random_pixels(color_type, depth, 13, 6)
+    bits = depth * (3 if color_type == 2 else 1)
+    bpp = max(1, bits // 8)
+    rows = [pack_row(samples, depth) for samples in pixels]
+    assert _unfilter(encode(rows, bpp, [kind] * len(rows)), len(rows), len(rows[0]), bpp) == rows
+
+
+def test_unfilter_mixed_filters_on_shipped_icon_data():
+    info = FPDF()._parsepng(f'{ICONS_PATH}/icon_education.png')
+    stride = (info['w'] * info['bpc'] + 7) // 8
+    rows = _unfilter(zlib.decompress(info['data']), info['h'], stride, 1)
+    kinds = [y % 5 for y in range(len(rows))]
+    assert _unfilter(encode(rows, 1, kinds), len(rows), stride, 1) == rows
+
+
+@pytest.mark.parametrize('color_type, depth', FORMATS)
+@pytest.mark.parametrize('size', [(5, 3), (13, 7), (1, 1)])
+def test_resample_matches_reference_nearest_neighbour(tmp_path, color_type, depth, size):
+    colors = 3 if color_type == 2 else 1
+    pixels = random_pixels(color_type, depth, 29, 17)
+    info = FPDF()._parsepng(write_png(tmp_path / 'icon.png', pixels, color_type, depth, [y % 5 for y in range(17)]))
+    width, height = size
+    resized = _resample(info, width, height)
+
+    expected = []
+    for y in range(height):
+        source = pixels[int((y + 0.5) * 17 / height)]
+        row = []
+        for x in range(width):
+            sx = int((x + 0.5) * 29 / width)
+            row += source[sx * colors:(sx + 1) * colors]
+        expected.append(row)
+    assert decoded(resized) == expected
+    assert (resized['w'], resized['h']) == (width, height)
+    assert resized['dp'] == f"/Predictor 15 /Colors {colors} /BitsPerComponent {depth} /Columns {width}"
+    assert resized.get('pal') == info.get('pal')
+
+
+def test_resample_to_the_same_size_is_lossless(tmp_path):
+    pixels = random_pixels(3, 4, 20, 9)
+    info = FPDF()._parsepng(write_png(tmp_path / 'icon.png', pixels, 3, 4, [4] * 9))
+    assert decoded(_resample(info, 20, 9)) == pixels
+
+
+def test_load_icon_only_downscales(tmp_path):
+    path = write_png(tmp_path / 'icon.png', random_pixels(3, 4, 40, 20), 3, 4, [0] * 20)
+    full = FPDF()._parsepng(path)
+    # 40px at 200 dpi is about 5mm: wider prints keep the original
+    assert load_icon(path, width_mm=8, dpi=200)['data'] == full['data']
+    assert load_icon(path)['data'] == full['data']
+    small = load_icon(path, width_mm=2.54, dpi=200)
+    assert (small['w'], small['h']) == (20, 10)
+
+
+def test_load_icon_keeps_images_with_alpha(tmp_path, monkeypatch):
+    path = write_png(tmp_path / 'icon.png', random_pixels(3, 4, 40, 20), 3, 4, [0] * 20)
+    parse = FPDF._parsepng
+    monkeypatch.setattr(FPDF, '_parsepng', lambda self, name: dict(parse(self, name), smask=b'mask'))
+    assert load_icon(path, width_mm=1)['w'] == 40
+
+
+def test_shipped_icons_resample_like_the_reference():
+    for name in ('icon_skills.png', 'icon_email.png'):
+        info = FPDF()._parsepng(f'{ICONS_PATH}/{name}')
+        small = load_icon(f'{ICONS_PATH}/{name}', width_mm=8)
+        source = decoded(info)
+        assert decoded(small) == [
+            [source[int((y + 0.5) * info['h'] / small['h'])][int((x + 0.5) * info['w'] / small['w'])]
+             for x in range(small['w'])]
+            for y in range(small['h'])]
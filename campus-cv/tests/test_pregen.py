@@ -0,0 +1,167 @@
+import threading
+import time
+import pytest
+import pregen
+from pregen import Pregenerator, details_digest
+
+
+class Builds:
+    """Stand-in for the PDF build: records the details and writes a small file."""
+
+    def __init__(self):
+        self.built = []
+        self.done = threading.Event()
+
+    def __call__(self, user_details, file_path):
+        self.built.append(user_details)
+        with open(file_path, 'w') as f:
+            f.write(user_details['fname'])
+        self.done.set()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def builds():
+    return Builds()
+
+
+def test_digest_ignores_bookkeeping_fields():
+    details = {'fname': 'Dana', 'jobs': [{'title': 'Intern'}]}
+    assert details_digest(details) == details_digest(dict(details, cv_path='x.pdf', is_cv_created=True))
+    assert details_digest(details) != details_digest(dict(details, fname='Dan'))
+
+
+def test_edits_in_a_row_build_once_with_the_latest_details(tmp_path, builds):
+    pregenerator = Pregenerator(builds, str(tmp_path), delay=0.2)
+    assert pregenerator.schedule(1, {'fname': 'first'})
+    assert pregenerator.schedule(1, {'fname': 'second'})
+    assert builds.done.wait(5)
+    wait_for(lambda: pregenerator.lookup(1, {'fname': 'second'}))
+    assert builds.built == [{'fname': 'second'}]
+    assert pregenerator.lookup(1, {'fname': 'first'}) is None
+
+
+def test_unchanged_details_are_not_rebuilt(tmp_path, builds):
+    pregenerator = Pregenerator(builds, str(tmp_path), delay=0)
+    pregenerator.schedule(1, {'fname': 'same'})
+    wait_for(lambda: pregenerator.lookup(1, {'fname': 'same'}))
+    pregenerator.schedule(1, {'fname': 'same', 'cv_path': 'saved.pdf'})
+    wait_for(lambda: not pregenerator.pending)
+    time.sleep(0.1)
+    assert len(builds.built) == 1
+
+
+def test_only_the_latest_build_is_kept(tmp_path, builds):
+    pregenerator = Pregenerator(builds, str(tmp_path), delay=0)
+    pregenerator.schedule(1, {'fname': 'old'})
+    wait_for(lambda: pregenerator.lookup(1, {'fname': 'old'}))
+    pregenerator.schedule(1, {'fname': 'new'})
+    wait_for(lambda: pregenerator.lookup(1, {'fname': 'new'}))
+    wait_for(lambda: pregenerator.lookup(1, {'fname': 'old'}) is None)
+    assert [str(path) for path in tmp_path.iterdir()] == [pregenerator.lookup(1, {'fname': 'new'})]
+
+
+def test_hourly_limit(tmp_path, builds):
+    pregenerator = Pregenerator(builds, str(tmp_path), delay=0, per_hour=2)
+    for name in ('a', 'b'):
+        pregenerator.schedule(1, {'fname': name})
+        wait_for(lambda: pregenerator.lookup(1, {'fname': name}))
+    pregenerator.schedule(1, {'fname': 'c'})
+    wait_for(lambda: not pregenerator.pending)
+    time.sleep(0.1)
+    assert [details['fname'] for details in builds.built] == ['a', 'b']
+    # The limit is per student
+    pregenerator.schedule(2, {'fname': 'd'})
+    wait_for(lambda: pregenerator.lookup(2, {'fname': 'd'}))
+
+
+def test_history_forgets_students_idle_for_an_hour(tmp_path, builds, monkeypatch):
+    pregenerator = Pregenerator(builds, str(tmp_path), delay=0)
+    now = time.monotonic()
+    assert pregenerator._within_hourly_limit('1')
+    assert pregenerator._within_hourly_limit('2')
+    monkeypatch.setattr(pregen.time, 'monotonic', lambda: now + 3601)
+    assert pregenerator._within_hourly_limit('3')
+    assert list(pregenerator.history) == ['3']
+
+
+def test_skipped_while_the_llm_is_unhealthy(tmp_path, builds):
+    pregenerator = Pregenerator(builds, str(tmp_path), can_run=lambda: False, delay=0)
+    pregenerator.schedule(1, {'fname': 'a'})
+    wait_for(lambda: not pregenerator.pending)
+    time.sleep(0.1)
+    assert builds.built == []
+
+
+def test_pending_is_bounded(tmp_path, builds):
+    pregenerator = Pregenerator(builds, str(tmp_path), delay=60, max_pending=2)
+    assert pregenerator.schedule(1, {'fname': 'a'})
+    assert pregenerator.schedule(2, {'fname': 'b'})
+    assert not pregenerator.schedule(3, {'fname': 'c'})
+    # Re-scheduling a student who is already pending is always accepted
+    assert pregenerator.schedule(1, {'fname': 'a2'})
+    pregenerator.discard(1)
+    assert pregenerator.schedule(3, {'fname': 'c'})
+
+
+def test_failed_build_leaves_nothing_behind(tmp_path):
+    failed = threading.Event()
+
+    def build(user_details, file_path):
+        open(file_path, 'w').close()
+        failed.set()
+        raise RuntimeError('llm down')
+
+    pregenerator = Pregenerator(build, str(tmp_path), delay=0)
+    pregenerator.schedule(1, {'fname': 'a'})
+    assert failed.wait(5)
+    wait_for(lambda: list(tmp_path.iterdir()) == [])
+    assert pregenerator.lookup(1, {'fname': 'a'}) is None
+
+
+class BlockingBuilds(Builds):
+    """Builds that hold their worker until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, user_details, file_path):
+        self.started.set()
+        assert self.release.wait(5)
+        super().__call__(user_details, file_path)
+
+
+def test_started_build_is_waited_for(tmp_path):
+    builds = BlockingBuilds()
+    pregenerator = Pregenerator(builds, str(tmp_path), delay=0)
+    pregenerator.schedule(1, {'fname': 'a'})
+    assert builds.started.wait(5)
+    threading.Timer(0.2, builds.release.set).start()
+    assert pregenerator.lookup(1, {'fname': 'a'}, wait=5)
+
+
+def test_queued_build_is_not_waited_for(tmp_path):
+    builds = BlockingBuilds()
+    pregenerator = Pregenerator(builds, str(tmp_path), delay=0, workers=1)
+    pregenerator.schedule(1, {'fname': 'a'})
+    assert builds.started.wait(5)
+    pregenerator.schedule(2, {'fname': 'b'})
+    wait_for(lambda: pregenerator.queued)
+    start = time.monotonic()
+    assert pregenerator.lookup(2, {'fname': 'b'}, wait=5) is None
+    assert time.monotonic() - start < 1
+    builds.release.set()
+    wait_for(lambda: pregenerator.lookup(2, {'fname': 'b'}))
+
+
+def test_lookup_wait_fits_the_front_budget():
+    import resilience
+    assert resilience.PREGEN_WAIT + resilience.LLM_TIMEOUT * (resilience.LLM_MAX_RETRIES + 1) < 90
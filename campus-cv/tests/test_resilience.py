@@ -0,0 +1,114 @@
+import anthropic
+import pytest
+import resilience
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock)
+    return clock
+
+
+def open_breaker(failures=3, reset_after=60):
+    breaker = CircuitBreaker('test', failures=failures, reset_after=reset_after)
+    for _ in range(failures):
+        assert breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('test', failures=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_single_trial_after_reset(clock):
+    breaker = open_breaker()
+    clock.now += 59
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_trial_outcome_closes_or_reopens(clock):
+    breaker = open_breaker()
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_unrecorded_trial_is_given_up(clock):
+    breaker = open_breaker()
+    clock.now += 60
+    assert breaker.allow()
+    clock.now += 59
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+@pytest.fixture
+def cv(monkeypatch, clock):
+    import main
+    monkeypatch.setattr(main, 'llm_breaker', open_breaker())
+    monkeypatch.setattr(main, 'update_student_cv', lambda user_id, cv_path: True)
+    clock.now += 60
+    return main
+
+
+def generate(cv):
+    client = cv.app.test_client()
+    return client.post('/generate-cv', json={'user_id': 1, 'user_details': {'fname': 'Dana', 'education': []}})
+
+
+def test_unexpected_llm_error_ends_the_trial(cv, monkeypatch):
+    def malformed(user_details):
+        raise IndexError('reply has no content')
+    monkeypatch.setattr(cv, 'generate_cv', malformed)
+    assert generate(cv).status_code == 500
+    assert cv.llm_breaker.state == OPEN
+    assert not cv.llm_breaker.trial_in_flight
+
+
+def test_llm_outage_reopens_with_503(cv, monkeypatch):
+    def unreachable(user_details):
+        raise anthropic.APIConnectionError(request=None)
+    monkeypatch.setattr(cv, 'generate_cv', unreachable)
+    assert generate(cv).status_code == 503
+    assert cv.llm_breaker.state == OPEN
+    assert generate(cv).status_code == 503
+
+
+def test_successful_trial_closes(cv, monkeypatch):
+    monkeypatch.setattr(cv, 'generate_cv', lambda user_details: 'Summary\nA student.')
+    response = generate(cv)
+    assert response.status_code == 200
+    assert response.data.startswith(b'%PDF')
+    assert cv.llm_breaker.state == CLOSED
@@ -0,0 +1,56 @@
+import logging
+import re
+import uuid
+from flask import g, has_request_context, request
+
+# Request ID handling mirrors campus-front/tracing.py.
+
+
+#######################################################################################
+#                                         Request IDs                                 #
+#######################################################################################
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Incoming ids end up in log lines and SQL comments, so anything unusual is replaced.
+VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def current_request_id():
+    if has_request_context():
+        return g.get('request_id', '-')
+    return '-'
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = current_request_id()
+        return True
+
+
+def install_log_filter():
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(RequestIdFilter())
+
+
+def sql_comment():
+    # Tag queries so pg_stat_activity / the postgres log can be matched to the front request.
+    return f"/* request_id={current_request_id()} */"
+
+
+#######################################################################################
+#                                         Flask Hooks                                 #
+#######################################################################################
+
+def _assign_request_id():
+    request_id = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = request_id if VALID_REQUEST_ID.match(request_id) else uuid.uuid4().hex
+
+
+def _echo_request_id(response):
+    response.headers[REQUEST_ID_HEADER] = g.get('request_id', '-')
+    return response
+
+
+def init_app(app):
+    app.before_request(_assign_request_id)
+    app.after_request(_echo_request_id)
@@ -0,0 +1,257 @@
+"""Async (ASGI) serving mode for campus-front.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+The read-only page views, which are nothing but backend round trips plus a
+render, run here as coroutines over a pooled httpx client, with independent
+backend calls issued concurrently. A page waiting on the api then holds a
+coroutine instead of an OS thread. They run inside a regular Flask request
+context, so sessions, flashes, url_for, templates and the before/after request
+hooks (deadlines, metrics, request IDs, capture) behave exactly as in main.py.
+Those hooks, and loading and saving the session, may block (store lookups, file
+writes), so they run on worker threads; only the view itself runs on the loop.
+
+Every other route (form posts, uploads, CV generation) is served by the
+unchanged WSGI app on a thread pool of WSGI_WORKERS threads.
+"""
+import asyncio
+import contextvars
+import io
+import os
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import flash, redirect, render_template, session, url_for
+from werkzeug.exceptions import HTTPException
+import warmup
+from backend import AsyncBackendClient
+from main import app as flask_app, backend_url, cv_url, relative_media_paths, shared_store
+
+
+#######################################################################################
+#                                  Config                                             #
+#######################################################################################
+
+WSGI_WORKERS = int(os.environ.get('WSGI_WORKERS', '32'))
+MAX_BACKEND_CONNECTIONS = int(os.environ.get('MAX_BACKEND_CONNECTIONS', '200'))
+
+backend_client = AsyncBackendClient({'api': backend_url, 'cv': cv_url}, shared_store,
+                                    max_connections=MAX_BACKEND_CONNECTIONS)
+wsgi_app = WSGIMiddleware(flask_app, workers=WSGI_WORKERS)
+
+# Flask endpoint name -> coroutine serving it
+ASYNC_VIEWS = {}
+
+
+def async_view(endpoint):
+    def decorator(func):
+        ASYNC_VIEWS[endpoint] = func
+        return func
+    return decorator
+
+
+def login_required():
+    if not session.get('logged_in'):
+        flash('Please log in to access this page.', 'warning')
+        return redirect(url_for('login'))
+    return None
+
+#######################################################################################
+#                                  Async Views                                        #
+#######################################################################################
+
+@async_view('main_dashboard')
+async def main_dashboard():
+    if not session.get('logged_in'):
+        jobs_response = await backend_client.get(f'{backend_url}/jobs?latest=true')
+        jobs = jobs_response.json() if jobs_response.status_code == 200 else None
+        return render_template('main.html', jobs=jobs)
+
+    user_id = session.get('user_id')
+    jobs_response, not_applied_jobs_response, response = await asyncio.gather(
+        backend_client.get(f'{backend_url}/jobs?latest=true'),
+        backend_client.get(f'{backend_url}/jobs?latest=true&user_id={user_id}'),
+        backend_client.get(f'{backend_url}/user_details?userID={user_id}'),
+    )
+    jobs = jobs_response.json() if jobs_response.status_code == 200 else None
+    jobs_not_applied = not_applied_jobs_response.json() if not_applied_jobs_response.status_code == 200 else None
+    if response.status_code == 200:
+        user_details = relative_media_paths(response.json())
+        if user_details.get('role') == 'student':
+            return render_template('index.html', user_details=user_details, jobs=jobs_not_applied)
+        elif user_details.get('role') == 'company':
+            students_response = await backend_client.get(f'{backend_url}/students')
+            if students_response.status_code == 200:
+                students = students_response.json()
+                return render_template('index.html', user_details=user_details, students=students)
+    return render_template('main.html', jobs=jobs)
+
+
+@async_view('jobs')
+async def jobs():
+    redirect_response = login_required()
+    if redirect_response:
+        return redirect_response
+
+    user_id = session.get('user_id')
+    user_details_response, jobs_response = await asyncio.gather(
+        backend_client.get(f'{backend_url}/user_details?userID={user_id}'),
+        backend_client.get(f'{backend_url}/jobs?latest=true'),
+    )
+    user_details = None
+    if user_details_response.status_code == 200:
+        user_details = relative_media_paths(user_details_response.json())
+    jobs = jobs_response.json() if jobs_response.status_code == 200 else None
+    return render_template('jobs.html', user_details=user_details, jobs=jobs)
+
+
+@async_view('profile')
+async def profile():
+    redirect_response = login_required()
+    if redirect_response:
+        return redirect_response
+
+    user_id = session.get('user_id')
+    role_response, response = await asyncio.gather(
+        backend_client.get(f'{backend_url}/user_role?userID={user_id}'),
+        backend_client.get(f'{backend_url}/user_details?userID={user_id}'),
+    )
+    if role_response.status_code != 200:
+        flash(f"Error fetching user role: {role_response.text}", 'danger')
+        return redirect(url_for('login'))
+    if response.status_code != 200:
+        flash(f"Error fetching user details: {response.text}", 'danger')
+        return redirect(url_for('login'))
+
+    role = role_response.json().get('role')
+    user_details = relative_media_paths(response.json())
+    if role == 'student':
+        return render_template('student_profile.html', user_details=user_details)
+    elif role == 'company':
+        return render_template('company_profile.html', user_details=user_details)
+    flash('Invalid user role.', 'danger')
+    return redirect(url_for('login'))
+
+
+async def profile_page(details_url, template, details_name):
+    """Shared body of company_view / student_view: someone's details plus the viewer's."""
+    redirect_response = login_required()
+    if redirect_response:
+        return redirect_response
+
+    session_user_id = session.get('user_id')
+    response, session_response = await asyncio.gather(
+        backend_client.get(details_url),
+        backend_client.get(f'{backend_url}/user_details?userID={session_user_id}'),
+    )
+    if response.status_code != 200 or session_response.status_code != 200:
+        return redirect(url_for('main_dashboard'))
+    return render_template(template, **{
+        details_name: relative_media_paths(response.json()),
+        'user_details': relative_media_paths(session_response.json()),
+    })
+
+
+@async_view('company_view')
+async def company_view(userID):
+    return await profile_page(f'{backend_url}/company?userID={userID}',
+                              'profile_view_company.html', 'company_details')
+
+
+@async_view('student_view')
+async def student_view(userID):
+    return await profile_page(f'{backend_url}/student?userID={userID}',
+                              'profile_view_student.html', 'student_details')
+
+
+@async_view('job_view')
+async def job_view(job_id):
+    redirect_response = login_required()
+    if redirect_response:
+        return redirect_response
+
+    session_user_id = session.get('user_id')
+    response, session_response = await asyncio.gather(
+        backend_client.get(f'{backend_url}/job?jobID={job_id}'),
+        backend_client.get(f'{backend_url}/user_details?userID={session_user_id}'),
+    )
+    user_details = None
+    if session_response.status_code == 200:
+        user_details = relative_media_paths(session_response.json())
+    if response.status_code == 200:
+        return render_template('job_view.html', job_details=response.json(), user_details=user_details)
+    flash('Failed to fetch job details. Please try again.', 'danger')
+    return redirect(url_for('main_dashboard'))
+
+#######################################################################################
+#                                  ASGI Plumbing                                      #
+#######################################################################################
+
+async def run_async_view(view, environ):
+    """Same lifecycle as Flask.wsgi_app, with the view awaited instead of called.
+
+    The request context lives in its own contextvars.Context. Every blocking step
+    (session open and save, before/after/teardown hooks) enters it on a worker
+    thread, one step at a time; the view runs on the loop in a task created from it.
+    """
+    context = contextvars.copy_context()
+    ctx = flask_app.request_context(environ)
+
+    def in_thread(func, *args):
+        return asyncio.to_thread(context.run, func, *args)
+
+    await in_thread(ctx.push)
+    error = None
+    try:
+        try:
+            try:
+                rv = await in_thread(flask_app.preprocess_request)
+                if rv is None:
+                    rv = await context.run(asyncio.ensure_future, view(**ctx.request.view_args))
+            except Exception as e:
+                rv = await in_thread(flask_app.handle_user_exception, e)
+            return await in_thread(flask_app.finalize_request, rv)
+        except Exception as e:
+            error = e
+            return await in_thread(flask_app.handle_exception, e)
+    finally:
+        await in_thread(ctx.pop, error)
+
+
+async def send_response(response, send, include_body):
+    headers = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response.headers.items()]
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+    try:
+        if include_body:
+            for chunk in response.iter_encoded():
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        response.close()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            with warmup.step('warmup async backend connections'):
+                await backend_client.warm_up()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await backend_client.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+        environ = build_environ(scope, io.BytesIO())
+        try:
+            endpoint, _ = flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            endpoint = None
+        if endpoint in ASYNC_VIEWS:
+            response = await run_async_view(ASYNC_VIEWS[endpoint], environ)
+            return await send_response(response, send, scope['method'] != 'HEAD')
+    return await wsgi_app(scope, receive, send)
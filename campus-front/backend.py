@@ -0,0 +1,394 @@
+import abc
+import codecs
+import itertools
+import json
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+import httpx
+import requests
+from prometheus_client import Counter
+import capture
+import metrics
+import resilience
+import tracing
+from store import MemoryStore, StoreError
+
+
+#######################################################################################
+#                                  Degraded Responses                                 #
+#######################################################################################
+
+# GET endpoints whose last good answer may be served while the backend is unavailable.
+STALE_OK = {('api', '/jobs')}
+STALE_ENTRIES = 256
+STALE_TTL = float(os.environ.get('STALE_TTL', '86400'))
+# A url's last good answer is re-stored at most this often per process, so a busy
+# endpoint does not turn into a store write per call.
+STALE_REFRESH = float(os.environ.get('STALE_REFRESH', '5'))
+STALE_WRITES_TRACKED = 10000
+# Answers that count against a service's circuit breaker, besides refused and timed
+# out calls: the ones that mean it is down or overloaded.
+UNAVAILABLE_STATUSES = {502, 503, 504}
+
+STALE_SERVED = Counter('front_backend_stale_responses_total',
+                       'Backend calls answered from the last good response instead of the service.',
+                       ['service', 'endpoint'])
+
+logger = logging.getLogger(__name__)
+
+
+class StaleCache:
+    """Last good response per url, kept in a Store so that every worker sharing the
+    store can fall back on it."""
+
+    def __init__(self, store, prefix='stale:', ttl=STALE_TTL, refresh=STALE_REFRESH):
+        self.store = store
+        self.prefix = prefix
+        self.ttl = ttl
+        self.refresh = refresh
+        self.written = {}  # url -> when this process last stored it
+
+    def put(self, url, status, headers, content):
+        now = time.monotonic()
+        if now - self.written.get(url, -self.refresh) < self.refresh:
+            return
+        if len(self.written) > STALE_WRITES_TRACKED:
+            self.written.clear()
+        self.written[url] = now
+        # Only the content type is kept: the body is stored already decoded.
+        meta = json.dumps([status, headers.get('Content-Type', 'application/json')]).encode()
+        try:
+            self.store.set(self.prefix + url, meta + b'\n' + content, ttl=self.ttl)
+        except StoreError as e:
+            logger.warning(f'stale cache not updated: {e}')
+
+    def get(self, url):
+        try:
+            record = self.store.get(self.prefix + url)
+        except StoreError as e:
+            logger.warning(f'stale cache unavailable: {e}')
+            return None
+        if record is None:
+            return None
+        meta, content = record.split(b'\n', 1)
+        status, content_type = json.loads(meta)
+        return status, {'Content-Type': content_type}, content
+
+#######################################################################################
+#                                  Streamed JSON                                      #
+#######################################################################################
+
+JSON_WHITESPACE = ' \t\r\n'
+# Characters that may still extend a number decoded at the end of the buffer ("1." + "5")
+NUMBER_TAIL = set('0123456789.eE+-')
+
+
+def iter_json_array(response, chunk_size=64 * 1024):
+    """Yield the items of a JSON array response one at a time.
+
+    Only the current chunk and the item being decoded are held in memory, so a
+    caller streaming the items straight into a template does not scale with the
+    length of the list. A `null` body (how the api encodes an empty list) yields
+    nothing. Anything else that is not exactly one JSON array (missing or extra
+    commas, trailing data, a truncated body) raises ValueError once it is reached.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    chunks = response.iter_content(chunk_size)
+    buffer, pos, final = '', 0, False
+    state = 'start'  # start -> first -> (value -> after)* -> end
+    try:
+        while True:
+            while pos < len(buffer) and buffer[pos] in JSON_WHITESPACE:
+                pos += 1
+            more = pos == len(buffer)
+            if not more:
+                char = buffer[pos]
+                if state == 'start':
+                    if char == '[':
+                        state, pos = 'first', pos + 1
+                    elif buffer.startswith('null', pos):
+                        state, pos = 'end', pos + 4
+                    elif 'null'.startswith(buffer[pos:]) and not final:
+                        more = True
+                    else:
+                        raise ValueError('expected a JSON array')
+                elif state == 'first' and char == ']':
+                    state, pos = 'end', pos + 1
+                elif state in ('first', 'value'):
+                    if char in ',]':
+                        raise ValueError(f'expected an array item, found {char!r}')
+                    try:
+                        item, end = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if final:
+                            raise
+                        more = True
+                    else:
+                        if not final and NUMBER_TAIL.issuperset(buffer[end:]):
+                            more = True  # the item may continue in the next chunk
+                        else:
+                            state, pos = 'after', end
+                            yield item
+                elif state == 'after':
+                    if char == ',':
+                        state, pos = 'value', pos + 1
+                    elif char == ']':
+                        state, pos = 'end', pos + 1
+                    else:
+                        raise ValueError(f"expected ',' or ']' between array items, found {char!r}")
+                else:
+                    raise ValueError('unexpected data after the JSON array')
+            if more:
+                if final:
+                    if state == 'end':
+                        return
+                    raise ValueError('unterminated JSON array' if state != 'start' else 'empty body')
+                chunk = next(chunks, None)
+                final = chunk is None
+                buffer = buffer[pos:] + text.decode(chunk or b'', final=final)
+                pos = 0
+    finally:
+        response.close()
+
+
+def stream_json_array(response):
+    """JsonArrayStream over `response`, or None if its body does not start as a JSON
+    array. The first item is read here, before a streamed page has sent its status."""
+    items = JsonArrayStream(response)
+    try:
+        bool(items)
+    except ValueError as e:
+        logger.warning(f'not a JSON array from {response.url}: {e}')
+        return None
+    return items
+
+
+class JsonArrayStream:
+    """Lazy list stand-in for templates: truthy if the array has at least one item,
+    and iterable (once) without decoding the whole array up front."""
+
+    def __init__(self, response):
+        self.items = iter_json_array(response)
+        self.head = []
+
+    def __bool__(self):
+        if not self.head:
+            self.head = list(itertools.islice(self.items, 1))
+        return bool(self.head)
+
+    def __iter__(self):
+        yield from self.head
+        self.head = []
+        yield from self.items
+
+#######################################################################################
+#                                  Backend Session                                    #
+#######################################################################################
+
+class Call:
+    def __init__(self, service, endpoint, method, url):
+        self.service = service
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.timeout = None
+        self.start = time.perf_counter()
+
+    @property
+    def name(self):
+        return f'{self.method} {self.service}{self.endpoint}'
+
+    @property
+    def stale_ok(self):
+        return self.method == 'GET' and (self.service, self.endpoint) in STALE_OK
+
+
+class BackendCalls(abc.ABC):
+    """Bookkeeping shared by the sync and async backend clients.
+
+    `services` maps a service name ("api", "cv") to its base url, so a call to
+    f"{backend_url}/user_details?userID=1" is recorded as ("api", "/user_details").
+    Every call is timed, forwards the current request ID, and is appended to the
+    capture file when capture mode is on.
+
+    Calls are bounded by the request deadline and guarded by a circuit breaker per
+    service. A refused, timed out or failed call does not raise: it returns a
+    503/504 response, or the last good one for STALE_OK endpoints. Those are kept
+    in `store`, shared with other workers when it is a shared Store. With
+    breakers=False no breaker is consulted or updated, for background calls whose
+    failures must not refuse the pages' calls.
+    """
+
+    def __init__(self, services, store=None, breakers=True):
+        self.services = services
+        self.breakers = {name: resilience.CircuitBreaker(name) for name in services} if breakers else {}
+        self.stale = StaleCache(store or MemoryStore(STALE_ENTRIES))
+
+    @abc.abstractmethod
+    def make_response(self, url, status, headers, content):
+        """A response object of the client's own type, for refused and failed calls."""
+
+    def endpoint_for(self, url):
+        for name, base_url in self.services.items():
+            if url.startswith(base_url):
+                return name, urlsplit(url).path or '/'
+        parts = urlsplit(url)
+        return parts.netloc, parts.path or '/'
+
+    def fallback(self, call, status, reason):
+        if call.stale_ok:
+            entry = self.stale.get(call.url)
+            if entry is not None:
+                STALE_SERVED.labels(call.service, call.endpoint).inc()
+                return self.make_response(call.url, *entry)
+        # A stand-in for the failed call, so views take their usual non-200 branch
+        return self.make_response(call.url, status, {'Content-Type': 'text/plain'}, reason.encode())
+
+    def begin(self, method, url):
+        """Returns (call, refusal); refusal is a response when the call must not be made."""
+        service, endpoint = self.endpoint_for(url)
+        call = Call(service, endpoint, method.upper(), url)
+        call.timeout = resilience.timeout_for(service, endpoint)
+        if call.timeout is None:
+            resilience.BREAKER_REJECTED.labels(service, 'deadline').inc()
+            return call, self.fallback(call, 504, 'Request deadline exceeded')
+        breaker = self.breakers.get(service)
+        if breaker is not None and not breaker.allow():
+            resilience.BREAKER_REJECTED.labels(service, 'open').inc()
+            return call, self.fallback(call, 503, f'{service} is unavailable')
+        return call, None
+
+    def failed(self, call, timed_out):
+        end = time.perf_counter()
+        breaker = self.breakers.get(call.service)
+        if breaker is not None:
+            breaker.record_failure()
+        if timed_out:
+            resilience.TIMEOUTS.labels(call.service, call.endpoint).inc()
+        metrics.observe_backend_call(call.service, call.endpoint, call.method, 'error', end - call.start)
+        tracing.record_span('backend', call.name, call.start, end, status='error')
+        capture.record_outbound(call.service, call.endpoint, call.method, call.url, 'error', end - call.start)
+        if timed_out:
+            return self.fallback(call, 504, f'{call.service} timed out')
+        return self.fallback(call, 503, f'{call.service} is unavailable')
+
+    def finished(self, call, response, request_bytes, streamed=False):
+        end = time.perf_counter()
+        # A streamed body is read later by the view; only its advertised size is known here.
+        if streamed:
+            response_bytes = int(response.headers.get('Content-Length', 0)) or None
+        else:
+            response_bytes = len(response.content)
+        breaker = self.breakers.get(call.service)
+        if breaker is not None:
+            # The api also answers a wrong password or a duplicate registration with a
+            # 500: that is a reply, not an outage, and must not open the breaker.
+            if response.status_code in UNAVAILABLE_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        metrics.observe_backend_call(call.service, call.endpoint, call.method, response.status_code, end - call.start)
+        tracing.record_span('backend', call.name, call.start, end,
+                            status=response.status_code, bytes=response_bytes)
+        capture.record_outbound(call.service, call.endpoint, call.method, call.url, response.status_code,
+                                end - call.start, response, request_bytes, response_bytes)
+
+        if response.status_code >= 500:
+            return self.fallback(call, response.status_code, response.text)
+        if response.status_code == 200 and call.stale_ok and not streamed:
+            self.stale.put(call.url, response.status_code, response.headers, response.content)
+        return response
+
+
+class BackendSession(BackendCalls, requests.Session):
+    """requests.Session for the WSGI views; see BackendCalls."""
+
+    def __init__(self, services, store=None, breakers=True):
+        requests.Session.__init__(self)
+        BackendCalls.__init__(self, services, store, breakers)
+
+    def make_response(self, url, status, headers, content):
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = content
+        response._content_consumed = True
+        response.url = url
+        return response
+
+    def warm_up(self):
+        """Open a pooled connection to every service before traffic arrives.
+
+        Goes through requests.Session directly: these are not calls made for a page.
+        """
+        for base_url in self.services.values():
+            try:
+                requests.Session.request(self, 'HEAD', base_url,
+                                         timeout=(resilience.CONNECT_TIMEOUT, resilience.DEFAULT_TIMEOUT))
+            except requests.RequestException as e:
+                logger.warning(f'could not pre-connect to {base_url}: {e}')
+
+    def request(self, method, url, *args, **kwargs):
+        call, refusal = self.begin(method, url)
+        if refusal is not None:
+            return refusal
+        kwargs.setdefault('timeout', call.timeout)
+        kwargs['headers'] = tracing.outbound_headers(kwargs.get('headers'))
+        try:
+            response = super().request(call.method, url, *args, **kwargs)
+        except requests.RequestException as e:
+            return self.failed(call, isinstance(e, requests.Timeout))
+        return self.finished(call, response, len(response.request.body or b''), kwargs.get('stream', False))
+
+
+class AsyncBackendClient(BackendCalls):
+    """httpx.AsyncClient counterpart of BackendSession for the ASGI views.
+
+    One pooled client per event loop; thousands of pending calls cost coroutines,
+    not threads.
+    """
+
+    def __init__(self, services, store=None, max_connections=200):
+        super().__init__(services, store)
+        self.client = httpx.AsyncClient(limits=httpx.Limits(max_connections=max_connections,
+                                                            max_keepalive_connections=max_connections))
+
+    def make_response(self, url, status, headers, content):
+        return httpx.Response(status, headers=headers, content=content,
+                              request=httpx.Request('GET', url))
+
+    async def request(self, method, url, **kwargs):
+        call, refusal = self.begin(method, url)
+        if refusal is not None:
+            return refusal
+        connect_timeout, read_timeout = kwargs.pop('timeout', call.timeout)
+        kwargs['headers'] = tracing.outbound_headers(kwargs.get('headers'))
+        try:
+            response = await self.client.request(call.method, url, timeout=httpx.Timeout(
+                read_timeout, connect=connect_timeout), **kwargs)
+        except httpx.TransportError as e:
+            return self.failed(call, isinstance(e, httpx.TimeoutException))
+        return self.finished(call, response, len(response.request.content))
+
+    async def warm_up(self):
+        for base_url in self.services.values():
+            try:
+                await self.client.head(base_url, timeout=httpx.Timeout(resilience.DEFAULT_TIMEOUT,
+                                                                       connect=resilience.CONNECT_TIMEOUT))
+            except httpx.TransportError as e:
+                logger.warning(f'could not pre-connect to {base_url}: {e}')
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url, **kwargs):
+        return await self.request('PUT', url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from urllib.parse import parse_qsl, urlsplit
+from flask import g, has_request_context, request, session
+
+
+#######################################################################################
+#                                  Config                                             #
+#######################################################################################
+
+# Opt-in traffic capture: when CAPTURE_FILE is set, every page request ("inbound") and
+# every backend call it makes ("outbound") is appended to it as one JSON line, for
+# campus-bench/replay.py to play back.
+CAPTURE_FILE = os.environ.get('CAPTURE_FILE')
+
+# Ids are replaced by stable pseudonyms so access patterns (same user, same job) survive
+# while the real ids do not. Set CAPTURE_SALT to keep pseudonyms stable across restarts.
+CAPTURE_SALT = os.environ.get('CAPTURE_SALT') or uuid.uuid4().hex
+
+SECRET_FIELDS = {'password', 'newpassword', 'token', 'email', 'company_email', 'fname'}
+ID_FIELDS = {'userid', 'user_id', 'jobid', 'job_id', 'education_id'}
+
+_capture_lock = threading.Lock()
+
+#######################################################################################
+#                                  Scrubbing                                          #
+#######################################################################################
+
+def pseudonym(value):
+    digest = hashlib.sha256(f'{CAPTURE_SALT}:{value}'.encode()).hexdigest()
+    # Small positive ints, so replayed ids still fit the <int:...> url converters.
+    return int(digest[:8], 16) % 99999 + 1
+
+
+def scrub_value(key, value):
+    if key.lower() in SECRET_FIELDS:
+        return '***'
+    if key.lower() in ID_FIELDS and value not in (None, ''):
+        return pseudonym(value)
+    return value
+
+
+def scrub_query(url):
+    return {key: scrub_value(key, value) for key, value in parse_qsl(urlsplit(url).query)}
+
+
+def _write(record):
+    line = json.dumps(record)
+    with _capture_lock:
+        with open(CAPTURE_FILE, 'a') as capture_file:
+            capture_file.write(line + '\n')
+
+#######################################################################################
+#                                  Recording                                          #
+#######################################################################################
+
+def _session_user():
+    user_id = session.get('user_id') if session.get('logged_in') else None
+    return str(user_id) if user_id is not None else None
+
+
+def record_outbound(service, endpoint, method, url, status, elapsed, response=None, request_bytes=0,
+                    response_bytes=0):
+    if not CAPTURE_FILE:
+        return
+    query = dict(parse_qsl(urlsplit(url).query))
+    if has_request_context() and response is not None and endpoint in ('/user_role', '/user_details'):
+        # Remember the caller's role so replay can log in as the same kind of user.
+        if query.get('userID') == _session_user() and response.status_code == 200:
+            try:
+                g.capture_role = response.json().get('role')
+            except ValueError:
+                pass
+    _write({
+        'type': 'outbound',
+        'ts': time.time(),
+        'request_id': g.get('request_id') if has_request_context() else None,
+        'service': service,
+        'endpoint': endpoint,
+        'method': method,
+        'query': scrub_query(url),
+        'status': status,
+        'duration_ms': round(elapsed * 1000, 2),
+        'request_bytes': request_bytes,
+        'response_bytes': response_bytes,
+    })
+
+
+def _start_capture():
+    g.capture_start = time.perf_counter()
+    g.capture_ts = time.time()
+
+
+def _counted(chunks, sent):
+    # The body of a streamed page is only known once it has all been sent
+    try:
+        for chunk in chunks:
+            sent[0] += len(chunk.encode() if isinstance(chunk, str) else chunk)
+            yield chunk
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def _remember_response(response):
+    g.capture_status = response.status_code
+    if response.is_streamed:
+        g.capture_sent = [0]
+        response.response = _counted(response.response, g.capture_sent)
+    else:
+        g.capture_sent = [response.calculate_content_length()]
+    return response
+
+
+def _record_inbound(exc):
+    # Runs at teardown, so a streamed page is timed and sized until its last chunk.
+    start = g.pop('capture_start', None)
+    if start is None or request.endpoint in (None, 'static', 'metrics', 'ready'):
+        return
+    user = _session_user()
+    _write({
+        'type': 'inbound',
+        'ts': g.capture_ts,
+        'request_id': g.get('request_id'),
+        'method': request.method,
+        'route': request.url_rule.rule,
+        'view_args': {key: scrub_value(key, value) for key, value in (request.view_args or {}).items()},
+        'query': {key: scrub_value(key, value) for key, value in request.args.items()},
+        'form_fields': sorted(request.form.keys()),
+        'user': pseudonym(user) if user else None,
+        'role': g.get('capture_role'),
+        'status': g.get('capture_status', 500),
+        'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+        'response_bytes': g.get('capture_sent', [None])[0],
+    })
+
+
+def init_app(app):
+    if CAPTURE_FILE:
+        app.before_request(_start_capture)
+        app.after_request(_remember_response)
+        app.teardown_request(_record_inbound)
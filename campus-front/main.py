@@ -1,11 +1,23 @@
+import warmup
+warmup.track_imports()
+import functools
 import logging
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_from_directory
-import requests
+from flask import Flask, render_template, stream_template, request, redirect, url_for, flash, session, jsonify, send_from_directory
 import json
+import threading
 import uuid
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
+import capture
+import metrics
+import ratelimit
+import resilience
+import store
+import tracing
+from backend import BackendSession, stream_json_array
+from sessions import StoreSessionInterface
+warmup.stop_tracking_imports()
 
 
 #######################################################################################
@@ -14,7 +26,8 @@ from werkzeug.utils import secure_filename
 
 
 logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s')
+                    format='%(asctime)s %(levelname)s %(name)s %(threadName)s [%(request_id)s] : %(message)s')
+tracing.install_log_filter()
 
 UPLOAD_FOLDER = '/usr/src/app/templates/static/assets/img/users'
 CV_UPLOAD_FOLDER = '/usr/src/app/templates/static/assets/pdf/cv'
@@ -27,10 +40,32 @@ years = range(1980, 2024)
 app = Flask(__name__, static_folder='templates/static')
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['CV_UPLOAD_FOLDER'] = CV_UPLOAD_FOLDER
-app.secret_key = 'ed0a9528-5906-457e-a373-f288b5e42579'
+app.secret_key = os.environ.get('SECRET_KEY')
+if not app.secret_key:
+    # No built-in fallback: a key in the source would let anyone forge session cookies
+    raise RuntimeError('SECRET_KEY must be set to a long random value, e.g. python -c "import secrets; print(secrets.token_hex())"')
 backend_url = os.environ.get('BACKEND_URL','http://api:8080')
 cv_url = os.environ.get('CV_URL', 'http://cv:3000')
 
+# Shared by every worker pointing at the same STORE_URL; see store.py
+shared_store = store.open_store()
+if store.STORE_URL != 'memory://':
+    # Sessions live in the store, so any worker or replica can serve any user
+    app.session_interface = StoreSessionInterface(shared_store)
+backend_session = BackendSession({'api': backend_url, 'cv': cv_url}, shared_store)
+# Work a request starts but does not wait for (CV refreshes). It has its own session
+# without circuit breakers, so a slow or failing cv scheduler never trips the breaker
+# that /generate-student-cv relies on.
+background_session = BackendSession({'api': backend_url, 'cv': cv_url}, breakers=False)
+background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='background')
+BACKGROUND_PENDING = int(os.environ.get('BACKGROUND_PENDING', '100'))
+background_slots = threading.BoundedSemaphore(BACKGROUND_PENDING)
+metrics.init_app(app)
+ratelimit.init_app(app)
+resilience.init_app(app)
+tracing.init_app(app)
+capture.init_app(app)
+
 #######################################################################################
 #                                  Helpers                                            #
 #######################################################################################
@@ -40,18 +75,78 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def relative_media_paths(details):
+    # The api stores absolute upload paths; templates need them relative to /static/
+    for key in ('profileImage', 'image_path', 'video_path'):
+        if key in details:
+            details[key] = details[key].split('/static/', 1)[-1]
+    return details
+
+# Reference data never changes while the app runs: read each CSV once per process
+# (normally during warm-up) and keep pandas out of the import path.
+@functools.lru_cache(maxsize=None)
 def load_majors():
+    import pandas as pd
     df = pd.read_csv('fields-of-study.csv')
     majors = df['Major'].dropna().str.title().unique().tolist()
     majors.sort()
     return majors
 
+@functools.lru_cache(maxsize=None)
 def load_country_cities():
+    import pandas as pd
     df = pd.read_csv('worldcities.csv')
     df_sorted = df.sort_values(by=['country', 'city'])
-    country_cities = [{'city': row['city'], 'country': row['country']} for index, row in df_sorted.iterrows()]
+    country_cities = df_sorted[['city', 'country']].to_dict('records')
     return country_cities
 
+def form_id(value, blank_ok=False):
+    """The positive integer id in a form field; a blank field is 0 (a new entry) when
+    blank_ok. Raises ValueError for anything else, e.g. a tampered hidden field."""
+    value = (value or '').strip()
+    if not value and blank_ok:
+        return 0
+    if not value.isdigit() or int(value) <= 0:
+        raise ValueError(f'invalid id {value!r}')
+    return int(value)
+
+def run_in_background(func, *args):
+    # Dropped rather than queued without bound when the backends cannot keep up
+    if not background_slots.acquire(blocking=False):
+        app.logger.warning(f'background queue full, skipped {func.__name__}')
+        return
+
+    def run():
+        try:
+            func(*args)
+        except Exception:
+            app.logger.exception(f'background {func.__name__} failed')
+        finally:
+            background_slots.release()
+    background_executor.submit(run)
+
+def refresh_cv(user_id, headers):
+    response = background_session.get(f'{backend_url}/user_details?userID={user_id}', headers=headers)
+    if response.status_code != 200:
+        return
+    user_details = response.json()
+    if user_details.get('role') != 'student':
+        return
+    cv_response = background_session.post(
+        f'{cv_url}/schedule-cv',
+        headers=headers,
+        json={'user_id': user_id, 'user_details': user_details}
+    )
+    if cv_response.status_code != 202:
+        app.logger.warning(f'could not schedule CV refresh for {user_id}: {cv_response.status_code}')
+
+def schedule_cv_refresh(user_id):
+    """Ask campus-cv to rebuild this student's CV in the background after a profile change,
+    so a later "generate CV" usually finds the PDF ready. Returns at once: the page never
+    waits on, or fails because of, the scheduling."""
+    # Captured here: the request ID is gone once the background thread runs
+    run_in_background(refresh_cv, user_id, tracing.outbound_headers())
+
 #######################################################################################
 #                                  Auth Routes                                        #
 #######################################################################################
@@ -62,7 +157,7 @@ def register():
         fname = request.form.get('fname')
         email = request.form.get('email')
         password = request.form.get('password')
-        response = requests.post(f"{backend_url}/register", json={"fname": fname, "email": email, "password": password})
+        response = backend_session.post(f"{backend_url}/register", json={"fname": fname, "email": email, "password": password})
         
         app.logger.debug(f'Registration attempt for {email} with response {response.status_code}')
         
@@ -80,7 +175,7 @@ def verify_email():
         flash('Verification token is missing.', 'danger')
         return redirect(url_for('login'))
 
-    response = requests.get(f"{backend_url}/verify_email?token={token}")
+    response = backend_session.get(f"{backend_url}/verify_email?token={token}")
     if response.status_code == 200:
         flash('Your email has been successfully verified.', 'success')
     else:
@@ -94,7 +189,7 @@ def login():
         email = request.form['email']
         password = request.form['password']
         # Sending login credentials to the backend
-        response = requests.post(f"{backend_url}/login", json={"email": email, "password": password})
+        response = backend_session.post(f"{backend_url}/login", json={"email": email, "password": password})
         
         app.logger.debug(f"Login response: {response.text}")  # Log the raw response text
         
@@ -131,7 +226,7 @@ def logout():
 def forgot_password():
     if request.method == 'POST':
         email = request.form['email']
-        response = requests.post(f"{backend_url}/forgot_password", json={"email": email})
+        response = backend_session.post(f"{backend_url}/forgot_password", json={"email": email})
         if response.status_code == 200:
             flash('Please check your email for the password reset link.', 'info')
             return render_template('reset_password_requested.html')
@@ -144,7 +239,7 @@ def change_password():
     if request.method == 'POST':
         token = request.form['token']
         newPassword = request.form['newPassword']
-        response = requests.post(f"{backend_url}/change_password", json={"token": token, "newPassword": newPassword})
+        response = backend_session.post(f"{backend_url}/change_password", json={"token": token, "newPassword": newPassword})
         if response.status_code == 200:
             flash('Your password has been changed successfully.', 'success')
             return redirect(url_for('login'))
@@ -242,10 +337,11 @@ def student_registration():
         }
 
         headers = {'Content-Type': 'application/json'}
-        response = requests.post(f'{backend_url}/student_registration', headers=headers, data=json.dumps(payload))
+        response = backend_session.post(f'{backend_url}/student_registration', headers=headers, data=json.dumps(payload))
 
         if response.status_code == 200:
             flash('Student registration successful!', 'success')
+            schedule_cv_refresh(user_id)
             return redirect(url_for('main_dashboard'))
         else:
             flash('Failed to register student. Please try again.', 'danger')
@@ -288,7 +384,7 @@ def company_registration():
 
         # Make a request to the backend
         headers = {'Content-Type': 'application/json'}
-        response = requests.post(f'{backend_url}/company_registration', json=form_data, headers=headers)
+        response = backend_session.post(f'{backend_url}/company_registration', json=form_data, headers=headers)
 
         if response.status_code == 200:
             flash('Company registration successful!', 'success')
@@ -310,21 +406,17 @@ def profile():
         return redirect(url_for('login'))
     
     user_id = session.get('user_id')
-    role_response = requests.get(f'{backend_url}/user_role?userID={user_id}')
+    role_response = backend_session.get(f'{backend_url}/user_role?userID={user_id}')
     if role_response.status_code == 200:
         role = role_response.json().get('role')
-        response = requests.get(f'{backend_url}/user_details?userID={user_id}')
+        response = backend_session.get(f'{backend_url}/user_details?userID={user_id}')
         if response.status_code == 200:
             user_details = response.json()
             if role == 'student':
-                if 'profileImage' in user_details:
-                    user_details['profileImage'] = user_details['profileImage'].split('/static/', 1)[-1]
+                relative_media_paths(user_details)
                 return render_template('student_profile.html', user_details=user_details)
             elif role == 'company':
-                if 'image_path' in user_details:
-                    user_details['image_path'] = user_details['image_path'].split('/static/', 1)[-1]
-                if 'video_path' in user_details:
-                    user_details['video_path'] = user_details['video_path'].split('/static/', 1)[-1]
+                relative_media_paths(user_details)
                 return render_template('company_profile.html', user_details=user_details)
             else:
                 flash('Invalid user role.', 'danger')
@@ -345,36 +437,35 @@ def profile():
 def main_dashboard():
     jobs = None  # Initialize jobs variable
     jobs_not_applied = None  # Initialize jobs_not_applied variable
-    jobs_response = requests.get(f'{backend_url}/jobs?latest=true')
+    jobs_response = backend_session.get(f'{backend_url}/jobs?latest=true')
     if jobs_response.status_code == 200:
         jobs = jobs_response.json()
     user_details = None
     if session.get('logged_in'):
         user_id = session.get('user_id')
-        not_applied_jobs_response = requests.get(f'{backend_url}/jobs?latest=true&user_id={user_id}')
+        not_applied_jobs_response = backend_session.get(f'{backend_url}/jobs?latest=true&user_id={user_id}')
         if not_applied_jobs_response.status_code == 200:
             jobs_not_applied = not_applied_jobs_response.json()
-        response = requests.get(f'{backend_url}/user_details?userID={user_id}')
+        response = backend_session.get(f'{backend_url}/user_details?userID={user_id}')
         if response.status_code == 200:
             user_details = response.json()
             if user_details.get('role') == 'student':
-                if 'profileImage' in user_details:
-                    user_details['profileImage'] = user_details['profileImage'].split('/static/', 1)[-1]
+                relative_media_paths(user_details)
                 return render_template('index.html', user_details=user_details, jobs=jobs_not_applied)
             elif user_details.get('role') == 'company':
-                if 'image_path' in user_details:
-                    user_details['image_path'] = user_details['image_path'].split('/static/', 1)[-1]
-                if 'video_path' in user_details:
-                    user_details['video_path'] = user_details['video_path'].split('/static/', 1)[-1]
+                relative_media_paths(user_details)
 
-                students_response = requests.get(f'{backend_url}/students')
+                # The students list grows with the user base: decode it while the page streams
+                students_response = backend_session.get(f'{backend_url}/students', stream=True)
+                students = None
                 if students_response.status_code == 200:
-                    students = students_response.json()
-                    return render_template('index.html', user_details=user_details, students=students)
-                else:
-                    return render_template('main.html', jobs=jobs)
-    else:
-        return render_template('main.html', jobs=jobs)
+                    students = stream_json_array(students_response)
+                if students is not None:
+                    return stream_template('index.html', user_details=user_details, students=students)
+                students_response.close()
+    # Anonymous visitors, and logged-in users whose details could not be fetched,
+    # get the public jobs page.
+    return render_template('main.html', jobs=jobs)
 
 @app.route('/jobs')
 def jobs():
@@ -383,25 +474,20 @@ def jobs():
         return redirect(url_for('login'))
 
     jobs = None  # Initialize jobs variable
+    user_details = None
     user_id = session.get('user_id')
-    user_details_response = requests.get(f'{backend_url}/user_details?userID={user_id}')
+    user_details_response = backend_session.get(f'{backend_url}/user_details?userID={user_id}')
     if user_details_response.status_code == 200:
         user_details = user_details_response.json()
-        role = user_details.get('role')
-        if role == 'student':
-            if 'profileImage' in user_details:
-                user_details['profileImage'] = user_details['profileImage'].split('/static/', 1)[-1]
-        elif role == 'company':
-            if 'image_path' in user_details:
-                user_details['image_path'] = user_details['image_path'].split('/static/', 1)[-1]
-            if 'video_path' in user_details:
-                user_details['video_path'] = user_details['video_path'].split('/static/', 1)[-1]
-
-    jobs_response = requests.get(f'{backend_url}/jobs?latest=true')
+        relative_media_paths(user_details)
+
+    jobs_response = backend_session.get(f'{backend_url}/jobs?latest=true', stream=True)
     if jobs_response.status_code == 200:
-        jobs = jobs_response.json()
+        jobs = stream_json_array(jobs_response)
+    else:
+        jobs_response.close()
 
-    return render_template('jobs.html', user_details=user_details, jobs=jobs)
+    return stream_template('jobs.html', user_details=user_details, jobs=jobs)
 
 
 #######################################################################################
@@ -414,29 +500,18 @@ def company_view(userID):
         flash('Please log in to access this page.', 'warning')
         return redirect(url_for('login'))
 
-    response = requests.get(f'{backend_url}/company?userID={userID}')
+    response = backend_session.get(f'{backend_url}/company?userID={userID}')
     if response.status_code == 200:
         company_details = response.json()
-        if 'image_path' in company_details:
-            company_details['image_path'] = company_details['image_path'].split('/static/', 1)[-1]
-        if 'video_path' in company_details:
-            company_details['video_path'] = company_details['video_path'].split('/static/', 1)[-1]
+        relative_media_paths(company_details)
     else:
         return redirect(url_for('main_dashboard'))
     
     session_user_id = session.get('user_id')
-    session_response = requests.get(f'{backend_url}/user_details?userID={session_user_id}')
+    session_response = backend_session.get(f'{backend_url}/user_details?userID={session_user_id}')
     if session_response.status_code == 200:
         user_details = session_response.json()
-        role = user_details.get('role')
-        if role == 'student':
-            if 'profileImage' in user_details:
-                user_details['profileImage'] = user_details['profileImage'].split('/static/', 1)[-1]
-        elif role == 'company':
-            if 'image_path' in user_details:
-                user_details['image_path'] = user_details['image_path'].split('/static/', 1)[-1]
-            if 'video_path' in user_details:
-                user_details['video_path'] = user_details['video_path'].split('/static/', 1)[-1]
+        relative_media_paths(user_details)
     else:
         return redirect(url_for('main_dashboard'))
     
@@ -457,13 +532,13 @@ def edit_company():
 
     app.logger.info(f'Editing company for user_id: {user_id}')
 
-    response = requests.put(
+    response = backend_session.put(
         f'{backend_url}/edit_company',
         json={
             'user_id':int(user_id),
             'size': size,
             'address': address,
-            'description': description
+            'description': description,
             'fname': fname,
             'email': email,
         }
@@ -497,11 +572,17 @@ def edit_education():
 
     app.logger.info(f'edit for {user_id} education {education_id}')
 
-    response = requests.put(
+    try:
+        education_id = form_id(education_id)
+    except ValueError:
+        flash('That education entry could not be found. Please reload the page and try again.', 'danger')
+        return redirect(url_for('profile'))
+
+    response = backend_session.put(
         f'{backend_url}/edit_education',
         json={
             'userId': int(user_id),
-            'id': int(education_id),
+            'id': education_id,
             'school': school,
             'degree': degree,
             'fieldOfStudy': field_of_study,
@@ -513,6 +594,7 @@ def edit_education():
 
     if response.status_code == 200:
         flash('Education updated successfully!', 'success')
+        schedule_cv_refresh(user_id)
     else:
         flash('Failed to update education. Please try again.', 'danger')
 
@@ -534,11 +616,17 @@ def edit_student_job():
 
     app.logger.info(f'edit for {user_id} job {job_id}')
 
-    response = requests.put(
+    try:
+        job_id = form_id(job_id)
+    except ValueError:
+        flash('That job could not be found. Please reload the page and try again.', 'danger')
+        return redirect(url_for('profile'))
+
+    response = backend_session.put(
         f'{backend_url}/edit_student_job',
         json={
             'user_id': int(user_id),
-            'id': int(job_id),
+            'id': job_id,
             'company': company,
             'title': title,
             'start_date': start_date,
@@ -549,39 +637,104 @@ def edit_student_job():
 
     if response.status_code == 200:
         flash('Student job updated successfully!', 'success')
+        schedule_cv_refresh(user_id)
     else:
         flash('Failed to update student job. Please try again.', 'danger')
 
     return redirect(url_for('profile'))
 
+def batch_entries(prefix, fields):
+    """Zip the `<prefix>[][<field>]` lists of a multi-entry form into dicts, dropping blank rows."""
+    columns = [request.form.getlist(f'{prefix}[][{field}]') for field in fields]
+    entries = []
+    for values in zip(*columns):
+        entry = dict(zip(fields, (value.strip() for value in values)))
+        if any(value for field, value in entry.items() if field != 'id'):
+            entries.append(entry)
+    return entries
+
+@app.route('/edit_profile_batch', methods=['POST'])
+def edit_profile_batch():
+    if not session.get('logged_in'):
+        flash('Please log in to access this page.', 'warning')
+        return redirect(url_for('login'))
+
+    user_id = int(session.get('user_id'))
+    try:
+        # Rows without an id are new entries; ticked "delete" boxes carry the ids to remove
+        jobs = [{
+            'id': form_id(job['id'], blank_ok=True),
+            'user_id': user_id,
+            'company': job['company'],
+            'title': job['title'],
+            'start_date': job['start_date'],
+            'end_date': job['end_date'],
+            'description': job['description']
+        } for job in batch_entries('jobs', ['id', 'company', 'title', 'start_date', 'end_date', 'description'])]
+        education = [{
+            'id': form_id(ed['id'], blank_ok=True),
+            'userId': user_id,
+            'school': ed['school'],
+            'degree': ed['degree'],
+            'fieldOfStudy': ed['fieldOfStudy'],
+            'startDate': ed['start_date'],
+            'endDate': ed['end_date'],
+            'description': ed['description']
+        } for ed in batch_entries('education', ['id', 'school', 'degree', 'fieldOfStudy', 'start_date', 'end_date', 'description'])]
+        deleted_jobs = [form_id(job_id) for job_id in request.form.getlist('delete_job')]
+        deleted_education = [form_id(education_id) for education_id in request.form.getlist('delete_education')]
+    except ValueError:
+        flash('Some entries could not be matched to your profile. Please reload the page and try again.', 'danger')
+        return redirect(url_for('profile'))
+
+    jobs = [job for job in jobs if job['id'] not in deleted_jobs]
+    education = [ed for ed in education if ed['id'] not in deleted_education]
+
+    if not (jobs or education or deleted_jobs or deleted_education):
+        flash('No changes to save.', 'info')
+        return redirect(url_for('profile'))
+
+    app.logger.info(f'batch edit for {user_id}: {len(jobs)} jobs, {len(education)} education, '
+                    f'{len(deleted_jobs)} job deletes, {len(deleted_education)} education deletes')
+
+    response = backend_session.put(
+        f'{backend_url}/edit_profile_batch',
+        json={
+            'userId': user_id,
+            'jobs': jobs,
+            'education': education,
+            'deletedJobs': deleted_jobs,
+            'deletedEducation': deleted_education
+        }
+    )
+
+    if response.status_code == 200:
+        flash('Profile updated successfully!', 'success')
+        schedule_cv_refresh(user_id)
+    else:
+        flash('Failed to update profile. Please try again.', 'danger')
+
+    return redirect(url_for('profile'))
+
 @app.route('/student/<int:userID>', methods=['GET'])
 def student_view(userID):
     if not session.get('logged_in'):
         flash('Please log in to access this page.', 'warning')
         return redirect(url_for('login'))
 
-    response = requests.get(f'{backend_url}/student?userID={userID}')
+    response = backend_session.get(f'{backend_url}/student?userID={userID}')
     if response.status_code == 200:
         student_details = response.json()
-        if 'profileImage' in student_details:
-            student_details['profileImage'] = student_details['profileImage'].split('/static/', 1)[-1]
+        relative_media_paths(student_details)
 
     else:
         return redirect(url_for('main_dashboard'))
     
     session_user_id = session.get('user_id')
-    session_response = requests.get(f'{backend_url}/user_details?userID={session_user_id}')
+    session_response = backend_session.get(f'{backend_url}/user_details?userID={session_user_id}')
     if session_response.status_code == 200:
         user_details = session_response.json()
-        role = user_details.get('role')
-        if role == 'student':
-            if 'profileImage' in user_details:
-                user_details['profileImage'] = user_details['profileImage'].split('/static/', 1)[-1]
-        elif role == 'company':
-            if 'image_path' in user_details:
-                user_details['image_path'] = user_details['image_path'].split('/static/', 1)[-1]
-            if 'video_path' in user_details:
-                user_details['video_path'] = user_details['video_path'].split('/static/', 1)[-1]
+        relative_media_paths(user_details)
     else:
         return redirect(url_for('main_dashboard'))
     
@@ -594,12 +747,12 @@ def generate_student_cv():
         return redirect(url_for('login'))
 
     user_id = session.get('user_id')
-    response = requests.get(f'{backend_url}/user_details?userID={user_id}')
+    response = backend_session.get(f'{backend_url}/user_details?userID={user_id}')
 
     if response.status_code == 200:
         user_details = response.json()
 
-        cv_response = requests.post(
+        cv_response = backend_session.post(
             f'{cv_url}/generate-cv',
             json={'user_id': user_id, 'user_details': user_details}
         )
@@ -627,7 +780,7 @@ def download_link_cv():
         return redirect(url_for('login'))
 
     user_id = session.get('user_id')
-    response = requests.get(f'{backend_url}/user_details?userID={user_id}')
+    response = backend_session.get(f'{backend_url}/user_details?userID={user_id}')
 
     if response.status_code == 200:
         user_details = response.json()
@@ -647,7 +800,7 @@ def download_student_cv():
         return redirect(url_for('login'))
 
     user_id = session.get('user_id')
-    response = requests.get(f'{backend_url}/user_details?userID={user_id}')
+    response = backend_session.get(f'{backend_url}/user_details?userID={user_id}')
 
     if response.status_code == 200:
         user_details = response.json()
@@ -674,14 +827,14 @@ def apply_for_job():
     company_email = request.form.get('company_email')
 
     # Get user details to construct the CV download link
-    user_details_response = requests.get(f'{backend_url}/user_details?userID={user_id}')
+    user_details_response = backend_session.get(f'{backend_url}/user_details?userID={user_id}')
     if user_details_response.status_code == 200:
         user_details = user_details_response.json()
         cv_filename = user_details.get('cv_path').split('/')[-1]
         cv_download_link = url_for('static', filename='assets/pdf/cv/' + cv_filename, _external=True)
 
         # Send the application to the backend
-        response = requests.post(
+        response = backend_session.post(
             f'{backend_url}/apply_for_job',
             json={
                 'user_id': user_id,
@@ -729,7 +882,7 @@ def post_job():
         }
 
         headers = {'Content-Type': 'application/json'}
-        response = requests.post(f'{backend_url}/post_job', json=payload, headers=headers)
+        response = backend_session.post(f'{backend_url}/post_job', json=payload, headers=headers)
 
         if response.status_code == 201:
             flash('Job posted successfully!', category='success')
@@ -741,21 +894,17 @@ def post_job():
     country_cities = load_country_cities()
     user_id = session.get('user_id')
     app.logger.info(f"Posting new job attempt for user with id {user_id}")
-    role_response = requests.get(f'{backend_url}/user_role?userID={user_id}')
+    role_response = backend_session.get(f'{backend_url}/user_role?userID={user_id}')
     if role_response.status_code == 200:
         role = role_response.json().get('role')
-        response = requests.get(f'{backend_url}/user_details?userID={user_id}')
+        response = backend_session.get(f'{backend_url}/user_details?userID={user_id}')
         if response.status_code == 200:
             user_details = response.json()
             if role == 'student':
-                if 'profileImage' in user_details:
-                    user_details['profileImage'] = user_details['profileImage'].split('/static/', 1)[-1]
+                relative_media_paths(user_details)
                 return render_template('new_job.html', user_details=user_details, country_cities=country_cities)
             elif role == 'company':
-                if 'image_path' in user_details:
-                    user_details['image_path'] = user_details['image_path'].split('/static/', 1)[-1]
-                if 'video_path' in user_details:
-                    user_details['video_path'] = user_details['video_path'].split('/static/', 1)[-1]
+                relative_media_paths(user_details)
                 return render_template('new_job.html', user_details=user_details, country_cities=country_cities)
             else:
                 flash('Invalid user role.', 'danger')
@@ -773,21 +922,14 @@ def job_view(job_id):
         flash('Please log in to access this page.', 'warning')
         return redirect(url_for('login'))
 
-    response = requests.get(f'{backend_url}/job?jobID={job_id}')
+    response = backend_session.get(f'{backend_url}/job?jobID={job_id}')
 
+    user_details = None
     session_user_id = session.get('user_id')
-    session_response = requests.get(f'{backend_url}/user_details?userID={session_user_id}')
+    session_response = backend_session.get(f'{backend_url}/user_details?userID={session_user_id}')
     if session_response.status_code == 200:
         user_details = session_response.json()
-        role = user_details.get('role')
-        if role == 'student':
-            if 'profileImage' in user_details:
-                user_details['profileImage'] = user_details['profileImage'].split('/static/', 1)[-1]
-        elif role == 'company':
-            if 'image_path' in user_details:
-                user_details['image_path'] = user_details['image_path'].split('/static/', 1)[-1]
-            if 'video_path' in user_details:
-                user_details['video_path'] = user_details['video_path'].split('/static/', 1)[-1]
+        relative_media_paths(user_details)
 
     if response.status_code == 200:
         job_details = response.json()
@@ -796,6 +938,25 @@ def job_view(job_id):
         flash('Failed to fetch job details. Please try again.', 'danger')
         return redirect(url_for('main_dashboard'))
 
-    
+
+#######################################################################################
+#                                  Warm-up                                            #
+#######################################################################################
+
+def compile_templates():
+    for name in app.jinja_env.list_templates(filter_func=lambda name: name.endswith('.html')):
+        if not name.startswith('static/'):
+            app.jinja_env.get_template(name)
+
+def load_reference_data():
+    load_majors()
+    load_country_cities()
+
+warmup.init_app(app, 'front', [
+    ('templates', compile_templates),
+    ('reference data', load_reference_data),
+    ('backend connections', backend_session.warm_up),
+])
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
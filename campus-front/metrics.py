@@ -0,0 +1,102 @@
+import time
+from flask import Response, g, request, before_render_template, template_rendered
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# The request hooks mirror campus-cv/metrics.py under this service's metric names.
+
+
+#######################################################################################
+#                                  Metrics                                            #
+#######################################################################################
+
+# Backend calls and page renders in this app range from a few ms to several seconds
+# (CV generation), so the buckets stretch further than the prometheus defaults.
+LATENCY_BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_COUNT = Counter('front_http_requests_total',
+                        'Requests handled, by Flask route.',
+                        ['route', 'method', 'status'])
+REQUEST_ERRORS = Counter('front_http_request_errors_total',
+                         'Requests that ended with a 5xx response, by Flask route.',
+                         ['route', 'method'])
+REQUEST_LATENCY = Histogram('front_http_request_duration_seconds',
+                            'Time spent handling a request, by Flask route.',
+                            ['route', 'method'], buckets=LATENCY_BUCKETS)
+
+BACKEND_COUNT = Counter('front_backend_requests_total',
+                        'Outbound calls to backend services, by endpoint.',
+                        ['service', 'endpoint', 'method', 'status'])
+BACKEND_ERRORS = Counter('front_backend_request_errors_total',
+                         'Outbound calls that failed to connect or returned a 5xx.',
+                         ['service', 'endpoint', 'method'])
+BACKEND_LATENCY = Histogram('front_backend_request_duration_seconds',
+                            'Time spent waiting on backend services, by endpoint.',
+                            ['service', 'endpoint', 'method'], buckets=LATENCY_BUCKETS)
+
+TEMPLATE_LATENCY = Histogram('front_template_render_seconds',
+                             'Time spent rendering Jinja templates.',
+                             ['template'], buckets=LATENCY_BUCKETS)
+
+
+def route_label():
+    # Use the rule ("/student/<int:userID>") rather than the path so ids do not
+    # explode the label cardinality.
+    if request.url_rule is not None:
+        return request.url_rule.rule
+    return 'unmatched'
+
+
+def observe_backend_call(service, endpoint, method, status, elapsed):
+    BACKEND_LATENCY.labels(service, endpoint, method).observe(elapsed)
+    BACKEND_COUNT.labels(service, endpoint, method, str(status)).inc()
+    if status == 'error' or (isinstance(status, int) and status >= 500):
+        BACKEND_ERRORS.labels(service, endpoint, method).inc()
+
+
+#######################################################################################
+#                                  Flask Hooks                                        #
+#######################################################################################
+
+def _start_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _remember_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _record_request(exc):
+    # Runs at teardown, so a streamed response is timed until its last chunk.
+    start = g.pop('metrics_start', None)
+    if start is None or request.endpoint in ('metrics', 'ready'):
+        return
+    status = g.get('metrics_status', 500)
+    route = route_label()
+    REQUEST_LATENCY.labels(route, request.method).observe(time.perf_counter() - start)
+    REQUEST_COUNT.labels(route, request.method, str(status)).inc()
+    if status >= 500:
+        REQUEST_ERRORS.labels(route, request.method).inc()
+
+
+def _template_started(sender, template, context, **extra):
+    g.setdefault('template_starts', []).append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    starts = g.get('template_starts')
+    if starts:
+        TEMPLATE_LATENCY.labels(template.name).observe(time.perf_counter() - starts.pop())
+
+
+def metrics_view():
+    return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    app.before_request(_start_timer)
+    app.after_request(_remember_status)
+    app.teardown_request(_record_request)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,150 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, g, request, session
+from prometheus_client import Counter, Gauge
+
+
+#######################################################################################
+#                                  Config                                             #
+#######################################################################################
+
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_ENTRIES = int(os.environ.get('RATE_LIMIT_ENTRIES', '100000'))
+# Number of reverse proxies in front of the app whose X-Forwarded-For can be trusted.
+# Behind Caddy this must be 1, or every client shares Caddy's address and its buckets;
+# it is only safe while clients cannot reach the app without going through the proxies.
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', '0'))
+# Requests allowed to run at once before new ones are shed; 0 turns shedding off.
+MAX_IN_FLIGHT = int(os.environ.get('MAX_IN_FLIGHT', '100'))
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600}
+
+
+def parse_budget(value):
+    # "20/minute" -> a bucket refilling at 20 tokens a minute that holds at most 20
+    count, period = value.split('/')
+    return float(count) / PERIODS[period], float(count)
+
+
+# Each client IP and each logged-in user gets one bucket per budget.
+BUDGETS = {
+    'default': parse_budget(os.environ.get('RATE_LIMIT_DEFAULT', '300/minute')),
+    'pages': parse_budget(os.environ.get('RATE_LIMIT_PAGES', '60/minute')),
+    'auth': parse_budget(os.environ.get('RATE_LIMIT_AUTH', '10/minute')),
+    'cv': parse_budget(os.environ.get('RATE_LIMIT_CV', '20/hour')),
+}
+# (method, route) -> budget; everything else draws on "default".
+ROUTE_BUDGETS = {
+    ('GET', '/'): 'pages',
+    ('GET', '/student/<int:userID>'): 'pages',
+    ('POST', '/login'): 'auth',
+    ('POST', '/register'): 'auth',
+    ('POST', '/forgot_password'): 'auth',
+    ('POST', '/generate-student-cv'): 'cv',
+}
+EXEMPT_ENDPOINTS = {'static', 'metrics', 'ready'}
+
+RATE_LIMITED = Counter('front_rate_limited_total',
+                       'Requests refused because a rate limit budget was used up.',
+                       ['budget', 'key'])
+SHED = Counter('front_requests_shed_total',
+               'Requests refused because too many were already in flight.')
+IN_FLIGHT = Gauge('front_requests_in_flight',
+                  'Requests currently being handled.')
+
+#######################################################################################
+#                                  Token Buckets                                      #
+#######################################################################################
+
+class TokenBuckets:
+    """Token buckets by key, least recently used evicted beyond `size` keys.
+
+    take() returns 0 when a token was available, otherwise the seconds until one is.
+    """
+
+    def __init__(self, size=RATE_LIMIT_ENTRIES):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, rate, burst):
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated = self.entries.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self.entries[key] = (tokens, now)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return wait
+
+
+buckets = TokenBuckets()
+in_flight = 0
+in_flight_lock = threading.Lock()
+
+
+def client_ip():
+    if TRUSTED_PROXIES and request.access_route:
+        route = request.access_route
+        return route[max(len(route) - TRUSTED_PROXIES, 0)]
+    return request.remote_addr or 'unknown'
+
+
+def refusal(status, message, retry_after):
+    # Plain text on purpose: no template, session lookup or backend call
+    return Response(message, status, {'Retry-After': str(max(1, math.ceil(retry_after)))},
+                    mimetype='text/plain')
+
+#######################################################################################
+#                                  Flask Hooks                                        #
+#######################################################################################
+
+def _admit():
+    global in_flight
+    if request.endpoint in EXEMPT_ENDPOINTS:
+        return None
+
+    if MAX_IN_FLIGHT:
+        with in_flight_lock:
+            if in_flight >= MAX_IN_FLIGHT:
+                SHED.inc()
+                return refusal(503, 'The service is busy, please try again shortly.', 1)
+            in_flight += 1
+            IN_FLIGHT.set(in_flight)
+        g.ratelimit_admitted = True
+
+    if RATE_LIMIT_ENABLED:
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        budget = ROUTE_BUDGETS.get((request.method, rule), 'default')
+        rate, burst = BUDGETS[budget]
+        keys = [('ip', client_ip())]
+        if session.get('user_id') is not None:
+            keys.append(('user', str(session['user_id'])))
+        for kind, value in keys:
+            wait = buckets.take(f'{budget}:{kind}:{value}', rate, burst)
+            if wait:
+                RATE_LIMITED.labels(budget, kind).inc()
+                return refusal(429, 'Too many requests, please slow down.', wait)
+    return None
+
+
+def _release(exc):
+    global in_flight
+    if g.pop('ratelimit_admitted', False):
+        with in_flight_lock:
+            in_flight -= 1
+            IN_FLIGHT.set(in_flight)
+
+
+def init_app(app):
+    # Call right after metrics.init_app() and before the others: a refused request is
+    # still counted in the request metrics but skips every other hook.
+    app.before_request(_admit)
+    app.teardown_request(_release)
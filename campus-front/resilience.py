@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from flask import g, has_request_context, request
+from prometheus_client import Counter, Gauge
+
+
+#######################################################################################
+#                                  Config                                             #
+#######################################################################################
+
+# Every page request gets a deadline; each backend call may use at most what is left of
+# it, capped by the endpoint's own timeout. CV generation waits on the LLM, so that
+# route and endpoint get much longer budgets.
+REQUEST_DEADLINE = float(os.environ.get('REQUEST_DEADLINE', '10'))
+ROUTE_DEADLINES = {
+    '/generate-student-cv': float(os.environ.get('CV_REQUEST_DEADLINE', '120')),
+}
+
+CONNECT_TIMEOUT = float(os.environ.get('BACKEND_CONNECT_TIMEOUT', '1'))
+DEFAULT_TIMEOUT = float(os.environ.get('BACKEND_TIMEOUT', '3'))
+ENDPOINT_TIMEOUTS = {
+    ('api', '/students'): 5.0,
+    ('api', '/apply_for_job'): 5.0,
+    ('cv', '/generate-cv'): float(os.environ.get('CV_TIMEOUT', '90')),
+    ('cv', '/schedule-cv'): 1.0,
+}
+
+BREAKER_FAILURES = int(os.environ.get('BREAKER_FAILURES', '5'))
+BREAKER_RESET = float(os.environ.get('BREAKER_RESET', '30'))
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = Gauge('front_backend_circuit_state',
+                      'Circuit breaker state per backend service (0 closed, 1 half-open, 2 open).',
+                      ['service'])
+BREAKER_REJECTED = Counter('front_backend_short_circuits_total',
+                           'Backend calls refused because the breaker was open or the deadline had passed.',
+                           ['service', 'reason'])
+TIMEOUTS = Counter('front_backend_timeouts_total',
+                   'Backend calls that timed out.',
+                   ['service', 'endpoint'])
+
+#######################################################################################
+#                                  Deadlines                                          #
+#######################################################################################
+
+def _start_deadline():
+    rule = request.url_rule.rule if request.url_rule is not None else None
+    g.deadline = time.monotonic() + ROUTE_DEADLINES.get(rule, REQUEST_DEADLINE)
+
+
+def remaining_budget():
+    if has_request_context() and 'deadline' in g:
+        return g.deadline - time.monotonic()
+    return None
+
+
+def timeout_for(service, endpoint):
+    """(connect, read) timeout for a call, or None if the request deadline has passed."""
+    read_timeout = ENDPOINT_TIMEOUTS.get((service, endpoint), DEFAULT_TIMEOUT)
+    connect_timeout = CONNECT_TIMEOUT
+    remaining = remaining_budget()
+    if remaining is not None:
+        if remaining <= 0:
+            return None
+        read_timeout = min(read_timeout, remaining)
+        connect_timeout = min(connect_timeout, remaining)
+    return connect_timeout, read_timeout
+
+#######################################################################################
+#                                  Circuit Breaker                                    #
+#######################################################################################
+
+# Same breaker as campus-cv/resilience.py, with this service's metric names.
+class CircuitBreaker:
+    """Consecutive-failure breaker for one backend service.
+
+    After `failures` failed calls in a row the breaker opens and calls are refused
+    for `reset_after` seconds; then a single trial call is let through (half-open)
+    and its outcome closes or re-opens the breaker. A trial whose outcome is never
+    recorded is given up after another `reset_after`, so a caller that dies mid-call
+    cannot leave the breaker half-open for good.
+    """
+
+    def __init__(self, service, failures=BREAKER_FAILURES, reset_after=BREAKER_RESET):
+        self.service = service
+        self.failures = failures
+        self.reset_after = reset_after
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.trial_started = 0.0
+        BREAKER_STATE.labels(service).set(STATE_VALUES[CLOSED])
+
+    def _set_state(self, state):
+        self.state = state
+        BREAKER_STATE.labels(self.service).set(STATE_VALUES[state])
+
+    def allow(self):
+        with self.lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_after:
+                self._set_state(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and (not self.trial_in_flight or now - self.trial_started >= self.reset_after):
+                self.trial_in_flight = True
+                self.trial_started = now
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failure_count = 0
+            self.trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            self.failure_count += 1
+            self.trial_in_flight = False
+            if self.state == HALF_OPEN or self.failure_count >= self.failures:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+
+def init_app(app):
+    app.before_request(_start_deadline)
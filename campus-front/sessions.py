@@ -0,0 +1,114 @@
+import logging
+import secrets
+from datetime import timedelta
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+from store import StoreError
+
+
+logger = logging.getLogger(__name__)
+
+#######################################################################################
+#                                  Server-side Sessions                               #
+#######################################################################################
+
+AUTH_KEYS = ('logged_in', 'user_id')
+
+
+def new_sid():
+    return secrets.token_urlsafe(32)
+
+
+class StoreSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.opened_auth = self.auth_state()
+
+    def auth_state(self):
+        return tuple(self.get(key) for key in AUTH_KEYS)
+
+
+class StoreSessionInterface(SessionInterface):
+    """Keeps session data in a shared Store; the cookie only carries a signed session id.
+
+    Any worker or replica reading the same store sees the same session. Ids that are
+    unknown to the store are never reused, and a session whose login state changed
+    (log in, log out, another user) is saved under a fresh id and the old one deleted,
+    so an id planted before login is worthless after it. When the store is
+    unreachable the request proceeds with an empty session rather than failing.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, store, prefix='session:'):
+        self.store = store
+        self.prefix = prefix
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='campus-front-session')
+
+    def _ttl(self, app):
+        lifetime = app.permanent_session_lifetime
+        return lifetime.total_seconds() if isinstance(lifetime, timedelta) else float(lifetime)
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+                data = self.store.get(self.prefix + sid)
+            except BadSignature:
+                data = None
+            except StoreError as e:
+                logger.warning(f'session store unavailable: {e}')
+                data = None
+            if data is not None:
+                return StoreSession(self.serializer.loads(data.decode()), sid=sid)
+        return StoreSession(sid=new_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.modified and not session.new:
+                try:
+                    self.store.delete(self.prefix + session.sid)
+                except StoreError as e:
+                    logger.warning(f'session store unavailable: {e}')
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+
+        rotate = not session.new and session.auth_state() != session.opened_auth
+        if not rotate and not self.should_set_cookie(app, session):
+            return
+        try:
+            if rotate:
+                self.store.delete(self.prefix + session.sid)
+                session.sid = new_sid()
+            self.store.set(self.prefix + session.sid, self.serializer.dumps(dict(session)).encode(),
+                           ttl=self._ttl(app))
+        except StoreError as e:
+            logger.warning(f'session store unavailable, session not saved: {e}')
+            return
+
+        response.set_cookie(name, self._signer(app).sign(session.sid).decode(),
+                            expires=self.get_expiration_time(app, session), httponly=httponly,
+                            domain=domain, path=path, secure=secure, samesite=samesite)
+        response.vary.add('Cookie')
@@ -0,0 +1,251 @@
+import abc
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlsplit
+
+
+#######################################################################################
+#                                  Config                                             #
+#######################################################################################
+
+# memory://                  this process only (the default)
+# sqlite:////dev/shm/front.db  every worker on this host; put the file on tmpfs to keep it in memory
+# redis://[:password@]host:6379/0  every worker and replica
+STORE_URL = os.environ.get('STORE_URL', 'memory://')
+STORE_TIMEOUT = float(os.environ.get('STORE_TIMEOUT', '0.5'))
+STORE_MAX_CONNECTIONS = int(os.environ.get('STORE_MAX_CONNECTIONS', '32'))
+MEMORY_STORE_ENTRIES = int(os.environ.get('MEMORY_STORE_ENTRIES', '10000'))
+
+
+class StoreError(Exception):
+    """The store could not be reached or refused a command; callers degrade, not fail."""
+
+#######################################################################################
+#                                  Stores                                             #
+#######################################################################################
+
+class Store(abc.ABC):
+    """Byte values by string key, each with an optional time to live in seconds."""
+
+    @abc.abstractmethod
+    def get(self, key):
+        """The value stored under `key`, or None if it is missing or expired."""
+
+    @abc.abstractmethod
+    def set(self, key, value, ttl=None):
+        """Store `value` under `key`, expiring after `ttl` seconds when given."""
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """Remove `key`; a missing key is not an error."""
+
+
+class MemoryStore(Store):
+    """A dict in this process, least recently used entries evicted beyond `size`."""
+
+    def __init__(self, size=MEMORY_STORE_ENTRIES):
+        self.size = size
+        self.entries = OrderedDict()  # key -> (expires or None, value)
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + ttl if ttl else None
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+
+class SqliteStore(Store):
+    """A SQLite file shared by every worker process on the host.
+
+    WAL mode lets readers run alongside the single writer; each thread keeps its own
+    connection. Expired rows are skipped on read and swept every PURGE_EVERY writes.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path, timeout=STORE_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        self.writes = 0
+        self._run('CREATE TABLE IF NOT EXISTS store (key TEXT PRIMARY KEY, value BLOB, expires REAL)')
+
+    def _connection(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self.local.db = db
+        return db
+
+    def _run(self, query, args=()):
+        try:
+            return self._connection().execute(query, args).fetchone()
+        except sqlite3.Error as e:
+            raise StoreError(f'sqlite store {self.path}: {e}') from e
+
+    def get(self, key):
+        row = self._run('SELECT value FROM store WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                        (key, time.time()))
+        return bytes(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        self._run('INSERT OR REPLACE INTO store (key, value, expires) VALUES (?, ?, ?)', (key, value, expires))
+        self.writes += 1
+        if self.writes % self.PURGE_EVERY == 0:
+            self._run('DELETE FROM store WHERE expires <= ?', (time.time(),))
+
+    def delete(self, key):
+        self._run('DELETE FROM store WHERE key = ?', (key,))
+
+
+class RedisStore(Store):
+    """Minimal client for the Redis protocol (RESP): GET, SET with PX, DEL.
+
+    Connections are pooled (up to `max_connections` idle ones kept) and dropped on
+    any error, so a restarted server is picked up by the next call.
+    """
+
+    def __init__(self, host, port=6379, db=0, password=None, timeout=STORE_TIMEOUT,
+                 max_connections=STORE_MAX_CONNECTIONS):
+        self.address = (host, port)
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.idle = []
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile('rb'))
+        try:
+            if self.password:
+                self._call(conn, 'AUTH', self.password)
+            if self.db:
+                self._call(conn, 'SELECT', self.db)
+        except (StoreError, OSError, ValueError):
+            conn[1].close()
+            sock.close()
+            raise
+        return conn
+
+    @staticmethod
+    def _encode(args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('connection closed by the server')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise StoreError(f'redis error: {rest.decode()}')
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError('connection closed by the server')
+            return data[:-2]
+        if kind == b'*':
+            length = int(rest)
+            return None if length < 0 else [self._read_reply(reader) for _ in range(length)]
+        raise StoreError(f'unexpected redis reply {line!r}')
+
+    def _call(self, conn, *args):
+        sock, reader = conn
+        sock.sendall(self._encode(args))
+        return self._read_reply(reader)
+
+    def command(self, *args):
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+        if conn is None:
+            # A connection that failed to set up (refused, AUTH or SELECT rejected) is
+            # already closed by _connect() and never reaches the pool.
+            try:
+                conn = self._connect()
+            except (OSError, ValueError) as e:
+                raise StoreError(f'redis {self.address[0]}:{self.address[1]}: {e}') from e
+        try:
+            reply = self._call(conn, *args)
+        except (OSError, ValueError) as e:
+            conn[1].close()
+            conn[0].close()
+            raise StoreError(f'redis {self.address[0]}:{self.address[1]}: {e}') from e
+        except StoreError:
+            # An error reply leaves the connection in step with the server
+            self._release(conn)
+            raise
+        self._release(conn)
+        return reply
+
+    def _release(self, conn):
+        with self.lock:
+            if len(self.idle) < self.max_connections:
+                self.idle.append(conn)
+                return
+        conn[1].close()
+        conn[0].close()
+
+    def get(self, key):
+        return self.command('GET', key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self.command('SET', key, value, 'PX', int(ttl * 1000))
+        else:
+            self.command('SET', key, value)
+
+    def delete(self, key):
+        self.command('DEL', key)
+
+
+def open_store(url=STORE_URL):
+    parts = urlsplit(url)
+    if parts.scheme == 'memory':
+        return MemoryStore()
+    if parts.scheme == 'sqlite':
+        return SqliteStore(unquote(parts.path))
+    if parts.scheme == 'redis':
+        db = int(parts.path.strip('/') or 0)
+        return RedisStore(parts.hostname or 'localhost', parts.port or 6379, db,
+                          unquote(parts.password) if parts.password else None)
+    raise ValueError(f'unsupported STORE_URL {url!r}')
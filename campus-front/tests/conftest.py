@@ -0,0 +1,32 @@
+import os
+import sys
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# The service modules are imported as top-level modules, as main.py does
+sys.path.insert(0, os.path.join(HERE, '..'))
+# fake_api.py and fake_redis.py stand in for the real backends
+sys.path.insert(0, os.path.join(HERE, '..', '..', 'campus-bench'))
+
+# main.py reads its config at import: a throwaway key and no warm-up thread
+os.environ.setdefault('SECRET_KEY', 'tests')
+os.environ.setdefault('WARMUP', 'false')
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when a test sets `now`."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(request, monkeypatch):
+    """A Clock patched into the `time` of the test module's CLOCK_MODULE."""
+    clock = Clock()
+    monkeypatch.setattr(request.module.CLOCK_MODULE.time, 'monotonic', clock)
+    return clock
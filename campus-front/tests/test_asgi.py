@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import httpx
+import pytest
+from fake_api import job, student
+import asgi
+import main
+
+
+class FakeAsyncBackend:
+    async def get(self, url, **kwargs):
+        if '/jobs' in url:
+            body = [job(i) for i in range(1, 4)]
+        else:
+            body = student(1)
+        return httpx.Response(200, json=body, request=httpx.Request('GET', url))
+
+
+class BlockingHooks:
+    """Records which thread each blocking step of the lifecycle ran on."""
+
+    def __init__(self):
+        self.threads = {}
+
+    def install(self, app, monkeypatch):
+        monkeypatch.setattr(app, 'before_request_funcs', {None: [*app.before_request_funcs.get(None, []), self.before]})
+        monkeypatch.setattr(app, 'teardown_request_funcs', {None: [*app.teardown_request_funcs.get(None, []), self.teardown]})
+        interface = app.session_interface
+        opened, saved = interface.open_session, interface.save_session
+
+        def open_session(*args):
+            self.threads['open_session'] = threading.current_thread()
+            return opened(*args)
+
+        def save_session(*args):
+            self.threads['save_session'] = threading.current_thread()
+            return saved(*args)
+        monkeypatch.setattr(interface, 'open_session', open_session)
+        monkeypatch.setattr(interface, 'save_session', save_session)
+
+    def before(self):
+        self.threads['before_request'] = threading.current_thread()
+
+    def teardown(self, exc):
+        self.threads['teardown_request'] = threading.current_thread()
+
+
+@pytest.fixture
+def hooks(monkeypatch):
+    monkeypatch.setattr(asgi, 'backend_client', FakeAsyncBackend())
+    hooks = BlockingHooks()
+    hooks.install(main.app, monkeypatch)
+    return hooks
+
+
+async def get(path, cookies=None):
+    transport = httpx.ASGITransport(app=asgi.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://front', cookies=cookies) as client:
+        return await client.get(path)
+
+
+def logged_in_cookie():
+    with main.app.test_client() as client:
+        with client.session_transaction() as session:
+            session['logged_in'] = True
+            session['user_id'] = 1
+        return {'session': client.get_cookie('session').value}
+
+
+def test_async_view_renders_with_the_session(hooks):
+    response = asyncio.run(get('/jobs', logged_in_cookie()))
+    assert response.status_code == 200
+    assert job(1)['title'] in response.text
+
+
+def test_blocking_steps_run_off_the_event_loop(hooks):
+    async def run():
+        loop_thread = threading.current_thread()
+        response = await get('/jobs', logged_in_cookie())
+        return loop_thread, response
+
+    loop_thread, response = asyncio.run(run())
+    assert response.status_code == 200
+    assert set(hooks.threads) == {'open_session', 'before_request', 'save_session', 'teardown_request'}
+    assert loop_thread not in hooks.threads.values()
+
+
+def test_before_request_refusal_skips_the_view(hooks, monkeypatch):
+    called = []
+
+    async def view():
+        called.append(True)
+    monkeypatch.setitem(asgi.ASYNC_VIEWS, 'main_dashboard', view)
+    monkeypatch.setattr(main.app, 'before_request_funcs', {None: [lambda: ('busy', 503)]})
+    response = asyncio.run(get('/'))
+    assert response.status_code == 503 and response.text == 'busy'
+    assert called == []
+
+
+def test_view_errors_are_handled_and_torn_down(hooks, monkeypatch):
+    async def broken():
+        raise KeyError('boom')
+    monkeypatch.setitem(asgi.ASYNC_VIEWS, 'main_dashboard', broken)
+    response = asyncio.run(get('/'))
+    assert response.status_code == 500
+    assert 'teardown_request' in hooks.threads
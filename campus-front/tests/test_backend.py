@@ -0,0 +1,81 @@
+import json
+import pytest
+from backend import JsonArrayStream, iter_json_array, stream_json_array
+
+
+class ChunkedResponse:
+    """A streamed response whose body arrives in chunks of a fixed size."""
+
+    url = 'http://api/students'
+
+    def __init__(self, body, size):
+        self.body = body.encode() if isinstance(body, str) else body
+        self.size = size
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), self.size):
+            yield self.body[i:i + self.size]
+
+    def close(self):
+        self.closed = True
+
+
+SIZES = [1, 2, 3, 7, 1024]
+
+VALID = [
+    ('null', []),
+    (' null \n', []),
+    ('[]', []),
+    (' [ ] ', []),
+    ('[1,2,3]', [1, 2, 3]),
+    ('[12345, -1.5e10, 0.25]', [12345, -1.5e10, 0.25]),
+    ('[true, false, null]', [True, False, None]),
+    ('[{"a": [1, 2], "b": "x,]"}, "[,]", []]', [{'a': [1, 2], 'b': 'x,]'}, '[,]', []]),
+    ('["Zoë", "日本"]', ['Zoë', '日本']),
+]
+
+MALFORMED = ['[1 2 3]', '[,,,1]', '[1,]', '[1,,2]', '[,]', '{}', '1', '"x"', 'nul', 'nullx', '[1] x',
+             '[1][2]', '[1, 2', '[', '', '  ', '[1.]', '[1.5e]']
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('body, items', VALID)
+def test_valid_bodies_at_any_chunk_boundary(body, items, size):
+    response = ChunkedResponse(body, size)
+    assert list(iter_json_array(response)) == items
+    assert response.closed
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('body', MALFORMED)
+def test_malformed_bodies_are_rejected(body, size):
+    response = ChunkedResponse(body, size)
+    with pytest.raises(ValueError):
+        list(iter_json_array(response))
+    assert response.closed
+
+
+def test_large_array_matches_json_loads():
+    body = json.dumps([{'id': i, 'name': f'student {i}', 'skills': ['a', 'b']} for i in range(500)])
+    assert list(iter_json_array(ChunkedResponse(body, 97))) == json.loads(body)
+
+
+def test_stream_is_lazy_and_truthy():
+    items = JsonArrayStream(ChunkedResponse('[1, 2, 3]', 1))
+    assert items
+    assert list(items) == [1, 2, 3]
+    assert not JsonArrayStream(ChunkedResponse('null', 1))
+
+
+@pytest.mark.parametrize('body', ['{"error": "x"}', '[,1]', 'nul'])
+def test_bad_prefix_is_caught_before_streaming(body):
+    response = ChunkedResponse(body, 2)
+    assert stream_json_array(response) is None
+    assert response.closed
+
+
+def test_stream_json_array_keeps_the_first_item():
+    items = stream_json_array(ChunkedResponse('[1, 2]', 2))
+    assert list(items) == [1, 2]
+    assert list(stream_json_array(ChunkedResponse('[]', 2))) == []
@@ -0,0 +1,52 @@
+import json
+import time
+import pytest
+from flask import Flask, stream_with_context
+import capture
+
+
+@pytest.fixture
+def captured(tmp_path, monkeypatch):
+    path = tmp_path / 'capture.jsonl'
+    monkeypatch.setattr(capture, 'CAPTURE_FILE', str(path))
+    app = Flask(__name__)
+    app.secret_key = 'tests'
+
+    @app.route('/list')
+    def streamed():
+        def rows():
+            for i in range(3):
+                time.sleep(0.05)
+                yield f'<li>{i}</li>'
+        return app.response_class(stream_with_context(rows()))
+
+    @app.route('/page')
+    def page():
+        return 'hello'
+
+    capture.init_app(app)
+
+    def records():
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text().splitlines()]
+    return app.test_client(), records
+
+
+def test_streamed_page_is_recorded_after_its_last_chunk(captured):
+    client, records = captured
+    response = client.get('/list')
+    # Nothing is written when the headers are ready
+    assert records() == []
+    assert response.get_data() == b'<li>0</li><li>1</li><li>2</li>'
+    [record] = records()
+    assert record['route'] == '/list' and record['status'] == 200
+    assert record['response_bytes'] == 30
+    assert record['duration_ms'] >= 150
+
+
+def test_plain_page_is_recorded(captured):
+    client, records = captured
+    client.get('/page')
+    [record] = records()
+    assert record['route'] == '/page' and record['response_bytes'] == 5
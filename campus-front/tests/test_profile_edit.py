@@ -0,0 +1,100 @@
+import re
+import pytest
+from fake_api import student
+import main
+
+
+def respond(url, body):
+    return main.background_session.make_response(url, 200, {'Content-Type': 'application/json'}, body)
+
+
+class FakeBackend:
+    """Answers the front's backend calls for one logged-in student and records the writes."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.puts = []
+
+    def get(self, url, **kwargs):
+        if '/user_role' in url:
+            return respond(url, b'{"role": "student"}')
+        return respond(url, main.json.dumps(student(self.user_id)).encode())
+
+    def put(self, url, json=None, **kwargs):
+        self.puts.append((url.rsplit('/', 1)[-1], json))
+        return respond(url, b'{}')
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = FakeBackend(1)
+    monkeypatch.setattr(main, 'backend_session', backend)
+    monkeypatch.setattr(main, 'schedule_cv_refresh', lambda user_id: None)
+    return backend
+
+
+@pytest.fixture
+def client(backend):
+    client = main.app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['user_id'] = 1
+    return client
+
+
+def flashes(client):
+    with client.session_transaction() as session:
+        return [message for _, message in session.get('_flashes', [])]
+
+
+def test_both_tabs_submit_one_form(client):
+    page = client.get('/profile').text
+    batch_forms = re.findall(r'<form[^>]*edit_profile_batch[^>]*>', page)
+    assert len(batch_forms) == 1 and 'id="profile-batch-form"' in batch_forms[0]
+    fields = re.findall(r'<(?:input|textarea)[^>]*name="(jobs\[\]|education\[\]|delete_)[^>]*>', page)
+    assert fields
+    owned = re.findall(r'<(?:input|textarea) form="profile-batch-form"[^>]*name="(?:jobs\[\]|education\[\]|delete_)', page)
+    assert len(owned) == len(fields)
+
+
+def test_jobs_and_education_in_one_submission(client, backend):
+    response = client.post('/edit_profile_batch', data={
+        'jobs[][id]': ['7', ''], 'jobs[][company]': ['Acme', 'Initech'], 'jobs[][title]': ['Dev', 'Intern'],
+        'jobs[][start_date]': ['2020-01-01', ''], 'jobs[][end_date]': ['', ''], 'jobs[][description]': ['', ''],
+        'education[][id]': ['3'], 'education[][school]': ['MIT'], 'education[][degree]': ['BSc'],
+        'education[][fieldOfStudy]': ['Physics'], 'education[][start_date]': [''], 'education[][end_date]': [''],
+        'education[][description]': [''],
+        'delete_education': ['4'],
+    })
+    assert response.status_code == 302
+    [(endpoint, payload)] = backend.puts
+    assert endpoint == 'edit_profile_batch'
+    assert [job['id'] for job in payload['jobs']] == [7, 0]
+    assert [ed['id'] for ed in payload['education']] == [3]
+    assert payload['deletedEducation'] == [4] and payload['deletedJobs'] == []
+
+
+@pytest.mark.parametrize('field, value', [
+    ('jobs[][id]', 'abc'),
+    ('jobs[][id]', '-1'),
+    ('delete_job', ''),
+    ('delete_education', '1.5'),
+])
+def test_bad_batch_ids_are_flashed(client, backend, field, value):
+    data = {'jobs[][id]': '1', 'jobs[][company]': 'Acme', 'jobs[][title]': '', 'jobs[][start_date]': '',
+            'jobs[][end_date]': '', 'jobs[][description]': ''}
+    data[field] = value
+    response = client.post('/edit_profile_batch', data=data)
+    assert response.status_code == 302
+    assert backend.puts == []
+    assert any('reload the page' in message for message in flashes(client))
+
+
+@pytest.mark.parametrize('endpoint, field', [('/edit_education', 'education_id'), ('/edit_student_job', 'job_id')])
+def test_bad_single_edit_ids_are_flashed(client, backend, endpoint, field):
+    for value in ('', 'x', '0'):
+        response = client.post(endpoint, data={field: value})
+        assert response.status_code == 302
+    assert backend.puts == []
+    response = client.post(endpoint, data={field: '5'})
+    assert backend.puts[0][1]['id'] == 5
@@ -0,0 +1,81 @@
+import pytest
+import ratelimit
+from ratelimit import TokenBuckets, parse_budget
+
+
+# The clock fixture (conftest.py) drives ratelimit's time.monotonic
+CLOCK_MODULE = ratelimit
+
+
+def test_parse_budget():
+    assert parse_budget('60/minute') == (1.0, 60.0)
+    assert parse_budget('20/hour') == (20 / 3600, 20.0)
+
+
+def test_burst_then_wait(clock):
+    buckets = TokenBuckets()
+    rate, burst = parse_budget('3/second')
+    assert [buckets.take('k', rate, burst) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take('k', rate, burst) == pytest.approx(1 / 3)
+
+
+def test_refill_is_capped_at_burst(clock):
+    buckets = TokenBuckets()
+    rate, burst = parse_budget('2/second')
+    buckets.take('k', rate, burst)
+    buckets.take('k', rate, burst)
+    clock.now += 0.5
+    assert buckets.take('k', rate, burst) == 0
+    assert buckets.take('k', rate, burst) > 0
+    clock.now += 3600
+    assert [buckets.take('k', rate, burst) for _ in range(3)] == [0, 0, pytest.approx(0.5)]
+
+
+def test_refused_take_does_not_spend(clock):
+    buckets = TokenBuckets()
+    rate, burst = 1.0, 1.0
+    buckets.take('k', rate, burst)
+    assert buckets.take('k', rate, burst) == pytest.approx(1)
+    clock.now += 0.5
+    assert buckets.take('k', rate, burst) == pytest.approx(0.5)
+    clock.now += 0.5
+    assert buckets.take('k', rate, burst) == 0
+
+
+def test_keys_are_independent(clock):
+    buckets = TokenBuckets()
+    buckets.take('a', 1.0, 1.0)
+    assert buckets.take('a', 1.0, 1.0) > 0
+    assert buckets.take('b', 1.0, 1.0) == 0
+
+
+def test_least_recently_used_key_is_evicted(clock):
+    buckets = TokenBuckets(size=2)
+    buckets.take('a', 1.0, 1.0)
+    buckets.take('b', 1.0, 1.0)
+    buckets.take('a', 1.0, 1.0)
+    buckets.take('c', 1.0, 1.0)
+    assert list(buckets.entries) == ['a', 'c']
+    # An evicted key starts over with a full bucket
+    assert buckets.take('b', 1.0, 1.0) == 0
+
+
+def test_refused_requests_are_counted(clock, monkeypatch):
+    from flask import Flask
+    import metrics
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    metrics.init_app(app)
+    ratelimit.init_app(app)
+    app.add_url_rule('/limited', 'limited', lambda: 'ok')
+    monkeypatch.setattr(ratelimit, 'buckets', TokenBuckets())
+    monkeypatch.setitem(ratelimit.BUDGETS, 'default', (1.0, 1.0))
+
+    refused = metrics.REQUEST_COUNT.labels('/limited', 'GET', '429')
+    before = refused._value.get()
+    client = app.test_client()
+    assert client.get('/limited').status_code == 200
+    response = client.get('/limited')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    assert refused._value.get() == before + 1
@@ -0,0 +1,113 @@
+import pytest
+import requests
+from flask import Flask
+import resilience
+from backend import BackendSession
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, timeout_for
+
+
+# The clock fixture (conftest.py) drives resilience's time.monotonic
+CLOCK_MODULE = resilience
+
+
+def open_breaker(failures=5, reset_after=30):
+    breaker = CircuitBreaker('test', failures=failures, reset_after=reset_after)
+    for _ in range(failures):
+        assert breaker.allow()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('test', failures=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_unrecorded_trial_is_given_up(clock):
+    breaker = open_breaker()
+    clock.now += 30
+    assert breaker.allow()
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_timeout_outside_a_request_is_the_endpoint_timeout():
+    assert timeout_for('cv', '/schedule-cv') == (resilience.CONNECT_TIMEOUT, 1.0)
+    assert timeout_for('api', '/anything') == (resilience.CONNECT_TIMEOUT, resilience.DEFAULT_TIMEOUT)
+
+
+def test_timeout_is_capped_by_the_request_deadline(clock):
+    app = Flask(__name__)
+    app.before_request(resilience._start_deadline)
+
+    @app.route('/page')
+    def page():
+        clock.now += resilience.REQUEST_DEADLINE - 0.5
+        assert timeout_for('api', '/students') == (0.5, 0.5)
+        clock.now += 0.5
+        assert timeout_for('api', '/students') is None
+        return 'ok'
+
+    assert app.test_client().get('/page').status_code == 200
+
+
+class Reply(requests.adapters.BaseAdapter):
+    """Transport that answers every request with `status`."""
+
+    def __init__(self, status):
+        super().__init__()
+        self.status = status
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response._content = b'{"message": "Invalid email or password"}'
+        response.request, response.url = request, request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def api_session(status):
+    session = BackendSession({'api': 'http://api'})
+    session.mount('http://api', Reply(status))
+    return session
+
+
+def test_failed_logins_leave_the_breaker_closed():
+    # The api answers a wrong password with a 500
+    session = api_session(500)
+    for _ in range(20):
+        assert session.post('http://api/login', json={'email': 'a@b.c', 'password': 'x'}).status_code == 500
+    assert session.breakers['api'].state == CLOSED
+
+
+@pytest.mark.parametrize('status', [502, 503, 504])
+def test_unavailable_answers_open_the_breaker(status):
+    session = api_session(status)
+    for _ in range(session.breakers['api'].failures):
+        session.get('http://api/students')
+    assert session.breakers['api'].state == OPEN
@@ -0,0 +1,88 @@
+import pytest
+from flask import Flask, session
+from sessions import StoreSessionInterface
+from store import MemoryStore
+
+
+@pytest.fixture
+def store():
+    return MemoryStore()
+
+
+@pytest.fixture
+def client(store):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = StoreSessionInterface(store)
+
+    @app.route('/visit')
+    def visit():
+        session['visits'] = session.get('visits', 0) + 1
+        return str(session['visits'])
+
+    @app.route('/login/<int:user_id>')
+    def login(user_id):
+        session['logged_in'] = True
+        session['user_id'] = user_id
+        return 'ok'
+
+    @app.route('/logout')
+    def logout():
+        session.pop('logged_in', None)
+        return 'ok'
+
+    @app.route('/whoami')
+    def whoami():
+        return str(session.get('user_id'))
+
+    return app.test_client()
+
+
+def session_cookie(client):
+    cookie = client.get_cookie('session')
+    return cookie.value if cookie else None
+
+
+def test_session_data_lives_in_the_store(client, store):
+    assert client.get('/visit').text == '1'
+    assert client.get('/visit').text == '2'
+    assert len(store.entries) == 1
+    assert b'visits' not in session_cookie(client).encode()
+
+
+def test_same_id_while_login_state_is_unchanged(client):
+    client.get('/visit')
+    before = session_cookie(client)
+    client.get('/visit')
+    assert session_cookie(client) == before
+
+
+def test_login_issues_a_new_id_and_drops_the_old_one(client, store):
+    client.get('/visit')
+    planted = session_cookie(client)
+    client.get('/login/7')
+    assert session_cookie(client) != planted
+    assert len(store.entries) == 1
+    assert client.get('/whoami').text == '7'
+    assert client.get('/visit').text == '2'
+
+    # The id from before login no longer opens anything
+    client.set_cookie('session', planted)
+    assert client.get('/whoami').text == 'None'
+
+
+def test_logout_and_switching_user_rotate_too(client):
+    client.get('/login/7')
+    logged_in = session_cookie(client)
+    client.get('/logout')
+    logged_out = session_cookie(client)
+    assert logged_out != logged_in
+    client.get('/login/8')
+    assert session_cookie(client) not in (logged_in, logged_out)
+    assert client.get('/whoami').text == '8'
+
+
+def test_tampered_cookie_starts_a_new_session(client):
+    client.get('/visit')
+    client.set_cookie('session', session_cookie(client) + 'x')
+    assert client.get('/visit').text == '1'
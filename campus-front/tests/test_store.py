@@ -0,0 +1,238 @@
+import io
+import socket
+import threading
+import time
+import pytest
+import fake_redis
+from store import MemoryStore, RedisStore, SqliteStore, Store, StoreError, open_store
+
+
+class RejectingAuth(fake_redis.Handler):
+    def run(self, db, name, args):
+        if name == b'AUTH':
+            return ValueError('invalid password')
+        return super().run(db, name, args)
+
+
+def start_redis(handler=fake_redis.Handler):
+    server = fake_redis.Server(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def redis_server():
+    fake_redis.databases.clear()
+    server = start_redis()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def redis_store(redis_server):
+    return RedisStore(*redis_server.server_address)
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis'])
+def any_store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryStore()
+    if request.param == 'sqlite':
+        return SqliteStore(str(tmp_path / 'store.db'))
+    return request.getfixturevalue('redis_store')
+
+#######################################################################################
+#                                  Every Store                                        #
+#######################################################################################
+
+def test_store_is_abstract():
+    with pytest.raises(TypeError):
+        Store()
+
+
+def test_get_set_delete(any_store):
+    assert any_store.get('missing') is None
+    any_store.set('key', b'value')
+    assert any_store.get('key') == b'value'
+    any_store.set('key', b'other')
+    assert any_store.get('key') == b'other'
+    any_store.delete('key')
+    assert any_store.get('key') is None
+    any_store.delete('key')
+
+
+def test_binary_values_round_trip(any_store):
+    # Protocol delimiters and non-utf8 bytes inside the value must not confuse the parser
+    value = b'\r\n$5\r\n*2\r\n\x00\xff' + bytes(range(256)) * 400
+    any_store.set('binary', value)
+    any_store.set('empty', b'')
+    assert any_store.get('binary') == value
+    assert any_store.get('empty') == b''
+
+
+def test_ttl(any_store):
+    any_store.set('short', b'1', ttl=0.05)
+    any_store.set('long', b'2', ttl=60)
+    any_store.set('forever', b'3')
+    time.sleep(0.1)
+    assert any_store.get('short') is None
+    assert any_store.get('long') == b'2'
+    assert any_store.get('forever') == b'3'
+
+
+def test_concurrent_use(any_store):
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(50):
+                any_store.set(f'{n}:{i}', str(i).encode())
+                assert any_store.get(f'{n}:{i}') == str(i).encode()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+#######################################################################################
+#                                  SqliteStore                                        #
+#######################################################################################
+
+def test_sqlite_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'store.db')
+    SqliteStore(path).set('key', b'value')
+    assert SqliteStore(path).get('key') == b'value'
+
+
+def test_sqlite_purges_expired_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(SqliteStore, 'PURGE_EVERY', 3)
+    sqlite_store = SqliteStore(str(tmp_path / 'store.db'))
+    sqlite_store.set('old', b'1', ttl=0.01)
+    time.sleep(0.05)
+    sqlite_store.set('a', b'2')
+    sqlite_store.set('b', b'3')
+    assert sqlite_store._run('SELECT COUNT(*) FROM store')[0] == 2
+
+
+def test_sqlite_errors_become_store_errors(tmp_path):
+    with pytest.raises(StoreError):
+        SqliteStore(str(tmp_path / 'missing' / 'store.db'))
+
+#######################################################################################
+#                                  RedisStore                                         #
+#######################################################################################
+
+def test_redis_reuses_pooled_connections(redis_store):
+    redis_store.set('key', b'value')
+    first = redis_store.idle[0]
+    assert redis_store.get('key') == b'value'
+    assert redis_store.idle == [first]
+
+
+def test_redis_select_keeps_databases_apart(redis_server):
+    host, port = redis_server.server_address
+    RedisStore(host, port, db=1).set('key', b'one')
+    assert RedisStore(host, port, db=2).get('key') is None
+    assert RedisStore(host, port, db=1).get('key') == b'one'
+
+
+def test_redis_error_reply_keeps_the_connection(redis_store):
+    redis_store.get('key')
+    with pytest.raises(StoreError, match='unknown command'):
+        redis_store.command('NOSUCHCOMMAND')
+    assert len(redis_store.idle) == 1
+    redis_store.set('key', b'value')
+    assert redis_store.get('key') == b'value'
+
+
+def test_redis_rejected_auth_is_not_pooled():
+    server = start_redis(RejectingAuth)
+    try:
+        redis_store = RedisStore(*server.server_address, password='wrong')
+        for _ in range(2):
+            with pytest.raises(StoreError, match='invalid password'):
+                redis_store.get('key')
+        assert redis_store.idle == []
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_redis_unreachable():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    redis_store = RedisStore('127.0.0.1', port)
+    with pytest.raises(StoreError):
+        redis_store.get('key')
+    assert redis_store.idle == []
+
+
+def test_redis_dropped_connection_is_replaced(redis_store):
+    redis_store.set('key', b'value')
+    redis_store.idle[0][0].shutdown(socket.SHUT_RDWR)
+    with pytest.raises(StoreError):
+        redis_store.get('key')
+    assert redis_store.idle == []
+    assert redis_store.get('key') == b'value'
+
+
+def test_redis_timeout_discards_the_connection():
+    class Slow(fake_redis.Handler):
+        latency = 0.2
+
+    server = start_redis(Slow)
+    try:
+        redis_store = RedisStore(*server.server_address, timeout=0.05)
+        with pytest.raises(StoreError):
+            redis_store.set('key', b'value')
+        # A late reply must not be read as the answer to the next command
+        assert redis_store.idle == []
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_redis_idle_pool_is_bounded(redis_server):
+    redis_store = RedisStore(*redis_server.server_address, max_connections=2)
+    conns = [redis_store._connect() for _ in range(3)]
+    for conn in conns:
+        redis_store._release(conn)
+    assert len(redis_store.idle) == 2
+
+
+def test_redis_reply_parser():
+    redis_store = RedisStore('127.0.0.1')
+    read = lambda data: redis_store._read_reply(io.BytesIO(data))
+    assert read(b'+OK\r\n') == 'OK'
+    assert read(b':42\r\n') == 42
+    assert read(b'$-1\r\n') is None
+    assert read(b'$3\r\na\r\n\r\n') == b'a\r\n'
+    assert read(b'*2\r\n$1\r\nx\r\n:1\r\n') == [b'x', 1]
+    assert read(b'*-1\r\n') is None
+    with pytest.raises(StoreError, match='boom'):
+        read(b'-ERR boom\r\n')
+    with pytest.raises(ConnectionError):
+        read(b'$5\r\nab')
+    with pytest.raises(ConnectionError):
+        read(b'+OK')
+    with pytest.raises(StoreError):
+        read(b'?what\r\n')
+
+#######################################################################################
+#                                  open_store                                         #
+#######################################################################################
+
+def test_open_store(tmp_path):
+    assert isinstance(open_store('memory://'), MemoryStore)
+    assert isinstance(open_store(f'sqlite:///{tmp_path}/store.db'), SqliteStore)
+    redis_store = open_store('redis://:p%40ss@cache:6380/3')
+    assert (redis_store.address, redis_store.db, redis_store.password) == (('cache', 6380), 3, 'p@ss')
+    assert open_store('redis://').address == ('localhost', 6379)
+    with pytest.raises(ValueError):
+        open_store('memcached://cache')
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from flask import g, has_request_context, request, before_render_template, template_rendered
+
+# Request ID handling mirrors campus-cv/tracing.py.
+
+
+#######################################################################################
+#                                  Request IDs                                        #
+#######################################################################################
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Incoming ids are logged and forwarded downstream, so anything unusual is replaced.
+VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Opt-in waterfall tracing: when TRACE_FILE is set, every request appends one JSON line
+# listing the outbound calls and template renders it made, relative to its start.
+TRACE_FILE = os.environ.get('TRACE_FILE')
+
+_trace_lock = threading.Lock()
+
+
+def current_request_id():
+    if has_request_context():
+        return g.get('request_id', '-')
+    return '-'
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = current_request_id()
+        return True
+
+
+def install_log_filter():
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(RequestIdFilter())
+
+
+def outbound_headers(headers=None):
+    headers = dict(headers or {})
+    if has_request_context() and 'request_id' in g:
+        headers.setdefault(REQUEST_ID_HEADER, g.request_id)
+    return headers
+
+
+#######################################################################################
+#                                  Waterfall                                          #
+#######################################################################################
+
+def record_span(kind, name, start, end, **attrs):
+    if not TRACE_FILE or not has_request_context() or 'trace_start' not in g:
+        return
+    span = {
+        'kind': kind,
+        'name': name,
+        'start_ms': round((start - g.trace_start) * 1000, 2),
+        'duration_ms': round((end - start) * 1000, 2),
+    }
+    span.update(attrs)
+    g.trace_spans.append(span)
+
+
+def _write_trace(record):
+    line = json.dumps(record)
+    with _trace_lock:
+        with open(TRACE_FILE, 'a') as trace_file:
+            trace_file.write(line + '\n')
+
+
+#######################################################################################
+#                                  Flask Hooks                                        #
+#######################################################################################
+
+def _assign_request_id():
+    request_id = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = request_id if VALID_REQUEST_ID.match(request_id) else uuid.uuid4().hex
+    if TRACE_FILE:
+        g.trace_start = time.perf_counter()
+        g.trace_spans = []
+
+
+def _echo_request_id(response):
+    response.headers[REQUEST_ID_HEADER] = g.get('request_id', '-')
+    g.trace_status = response.status_code
+    return response
+
+
+def _finish_trace(exc):
+    # Runs at teardown, so spans from a streamed template are included.
+    if 'trace_start' in g:
+        _write_trace({
+            'request_id': g.request_id,
+            'timestamp': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'route': request.url_rule.rule if request.url_rule is not None else None,
+            'status': g.get('trace_status', 500),
+            'duration_ms': round((time.perf_counter() - g.trace_start) * 1000, 2),
+            'spans': g.trace_spans,
+        })
+
+
+def _template_started(sender, template, context, **extra):
+    if 'trace_start' in g:
+        g.setdefault('trace_template_starts', []).append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    starts = g.get('trace_template_starts')
+    if starts:
+        record_span('template', template.name, starts.pop(), time.perf_counter())
+
+
+def init_app(app):
+    app.before_request(_assign_request_id)
+    app.after_request(_echo_request_id)
+    app.teardown_request(_finish_trace)
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
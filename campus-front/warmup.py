@@ -0,0 +1,128 @@
+import builtins
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Only the standard library is imported at module level, so that the import tracking
+# below also covers flask and friends when main.py is the first to import them.
+#
+# Keep identical to campus-cv/warmup.py apart from the banners.
+
+
+#######################################################################################
+#                                  Config                                             #
+#######################################################################################
+
+WARMUP_ENABLED = os.environ.get('WARMUP', 'true').lower() == 'true'
+
+logger = logging.getLogger(__name__)
+
+started = time.perf_counter()
+steps = []  # (step, seconds) in the order they finished
+ready = threading.Event()
+steps_lock = threading.Lock()
+step_gauge = None  # created in init_app()
+
+#######################################################################################
+#                                  Startup Report                                     #
+#######################################################################################
+
+def record(name, seconds):
+    with steps_lock:
+        steps.append((name, seconds))
+    if step_gauge is not None:
+        step_gauge.labels(name).set(seconds)
+
+
+@contextmanager
+def step(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def report():
+    with steps_lock:
+        recorded = list(steps)
+    return {
+        'ready': ready.is_set(),
+        'seconds_since_start': round(time.perf_counter() - started, 3),
+        'steps': [{'step': name, 'seconds': round(seconds, 4)} for name, seconds in recorded],
+    }
+
+
+_original_import = builtins.__import__
+_import_depth = 0
+_imports_started = None
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Time each top-level package the first time it is imported; nested imports count
+    # towards the package that pulled them in.
+    global _import_depth
+    top = name.partition('.')[0]
+    if level or _import_depth or top in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    _import_depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        _import_depth -= 1
+        record(f'import {top}', time.perf_counter() - start)
+
+
+def track_imports():
+    global _imports_started
+    _imports_started = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+
+def stop_tracking_imports():
+    builtins.__import__ = _original_import
+    record('imports (total)', time.perf_counter() - _imports_started)
+
+#######################################################################################
+#                                  Warm-up                                            #
+#######################################################################################
+
+def run(tasks):
+    """Run the (name, function) warm-up tasks in order, then report readiness.
+
+    A failing task is logged and skipped: the service still works, only colder.
+    """
+    for name, func in tasks:
+        with step(f'warmup {name}'):
+            try:
+                func()
+            except Exception as e:
+                logger.error(f'warm-up step {name} failed: {e}')
+    ready.set()
+    summary = ', '.join(f'{entry["step"]} {entry["seconds"]:.3f}s' for entry in report()['steps'])
+    logger.info(f'ready after {time.perf_counter() - started:.2f}s: {summary}')
+
+
+def ready_view():
+    from flask import jsonify
+    return jsonify(report()), 200 if ready.is_set() else 503
+
+
+def init_app(app, service, tasks):
+    """Serve /ready (503 until warm-up is done) and run the warm-up in the background."""
+    global step_gauge
+    from prometheus_client import Gauge
+    step_gauge = Gauge(f'{service}_startup_step_seconds',
+                       'Time spent in each import and warm-up step at startup.',
+                       ['step'])
+    with steps_lock:
+        for name, seconds in steps:
+            step_gauge.labels(name).set(seconds)
+    app.add_url_rule('/ready', 'ready', ready_view)
+    if not WARMUP_ENABLED:
+        tasks = []
+    threading.Thread(target=run, args=(tasks,), name='warmup', daemon=True).start()